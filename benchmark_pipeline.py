@@ -0,0 +1,338 @@
+"""
+Benchmark the statistics pipeline on synthetic inputs, without dotnet.
+
+  python benchmark_pipeline.py --components 300 --trx-results 20000 --csv-rows 2000
+  python benchmark_pipeline.py --compare benchmark_results.json   # against an older run
+
+A throwaway workspace gets a copy of the scripts (they work relative to
+their own folder), a generated C# tree with N components, TRX files with M
+results for the generated test classes and a detailed CSV with K rows.
+Every stage then runs in a fresh Python process that reports its wall and
+CPU time and its peak memory; the results are written as JSON.
+"""
+import io
+import os
+import re
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+import contextlib
+from pathlib import Path
+from datetime import datetime
+
+from generate_unit_tests import COMPONENT_RULES
+from profiling import peak_rss_mb
+import run_history
+
+BASE_PATH = Path(__file__).parent
+BENCHMARK_FILE = BASE_PATH / "benchmark_results.json"
+BENCHMARK_VERSION = 1
+STAGE_NAMES = ["generate", "parse_trx", "update_csv", "create_excel"]
+METHODS_PER_COMPONENT = 6
+FAILURE_RATE = 0.05
+SKIP_RATE = 0.02
+TRX_NAMESPACE = "http://microsoft.com/schemas/VisualStudio/TeamTest/2010"
+NAMESPACE_DECL_RE = re.compile(r'\bnamespace\s+([\w.]+)')
+
+def component_source(namespace, class_name, kind):
+    """C# source of one synthetic component with injected dependencies and public methods"""
+    methods = []
+    for idx in range(METHODS_PER_COMPONENT):
+        methods.append(f"""
+        public async Task<ItemDto> GetItem{idx}Async(int id, string name = "a {{literal}}", CancellationToken token = default)
+        {{
+            var item = await _repository.FindAsync(id, token);
+            if (item == null)
+            {{
+                _logger.LogWarning("Item {{Id}} not found", id);
+                return null;
+            }}
+            return new ItemDto {{ Id = item.Id, Name = $"{{name}}-{{item.Name}}" }};
+        }}
+""")
+    return f"""using System;
+using System.Threading;
+using System.Threading.Tasks;
+using Microsoft.Extensions.Logging;
+
+namespace {namespace}
+{{
+    public class {class_name} : I{class_name}
+    {{
+        private readonly I{kind}Store _repository;
+        private readonly ILogger<{class_name}> _logger;
+        
+        public {class_name}(I{kind}Store repository, ILogger<{class_name}> logger)
+        {{
+            _repository = repository;
+            _logger = logger;
+        }}
+{"".join(methods)}    }}
+}}
+"""
+
+def write_csharp_tree(workspace, component_count):
+    """Spread component_count components over the component folders"""
+    for idx in range(component_count):
+        folder, _, _, suffix = COMPONENT_RULES[idx % len(COMPONENT_RULES)]
+        kind = suffix[:-len(".cs")]
+        class_name = f"Bench{idx:05d}{kind}"
+        source_dir = workspace / folder
+        source_dir.mkdir(parents=True, exist_ok=True)
+        source = component_source(folder.replace("/", "."), class_name, kind)
+        (source_dir / f"{class_name}.cs").write_text(source, encoding='utf-8')
+
+def generated_test_classes(workspace):
+    """(test project, fully qualified test class) of every generated test file"""
+    classes = []
+    for test_file in sorted(workspace.glob("*.Tests/**/*Tests.cs")):
+        match = NAMESPACE_DECL_RE.search(test_file.read_text(encoding='utf-8'))
+        if match:
+            classes.append((test_file.relative_to(workspace).parts[0], f"{match.group(1)}.{test_file.stem}"))
+    return classes
+
+def write_trx_files(workspace, result_count, seed=0):
+    """Write one TRX file per test project with result_count results in total"""
+    classes = generated_test_classes(workspace)
+    if not classes:
+        return 0
+    rng = random.Random(seed)
+    by_project = {}
+    for idx in range(result_count):
+        project, class_name = classes[idx % len(classes)]
+        by_project.setdefault(project, []).append(f"{class_name}.Method{idx // len(classes)}")
+    
+    for project, test_names in by_project.items():
+        results_dir = workspace / project / "TestResults"
+        results_dir.mkdir(parents=True, exist_ok=True)
+        with open(results_dir / f"{project}.trx", 'w', encoding='utf-8') as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<TestRun xmlns="{TRX_NAMESPACE}">\n<Results>\n')
+            for test_name in test_names:
+                roll = rng.random()
+                outcome = "Failed" if roll < FAILURE_RATE else "NotExecuted" if roll < FAILURE_RATE + SKIP_RATE else "Passed"
+                duration = f"00:00:{rng.uniform(0.001, 2.0):010.7f}"
+                f.write(f'<UnitTestResult testName="{test_name}" outcome="{outcome}" duration="{duration}" '
+                        f'startTime="2024-01-01T00:00:00.0000000+00:00">')
+                f.write("<Output><StdOut>" + "log line of the test under benchmark\n" * 5 + "</StdOut>")
+                if outcome == "Failed":
+                    f.write("<ErrorInfo><Message>Expected True but found False</Message><StackTrace>"
+                            + f"   at {test_name}() in Tests.cs:line 42\n" * 20 + "</StackTrace></ErrorInfo>")
+                f.write("</Output></UnitTestResult>\n")
+            f.write("</Results>\n</TestRun>\n")
+    return len(by_project)
+
+def write_detailed_csv(workspace, row_count):
+    """Pad or trim the generated detailed CSV to row_count rows"""
+    detailed_csv = workspace / "Unit_Test_Statistics_Detailed.csv"
+    with open(detailed_csv, 'r', encoding='utf-8-sig') as f:
+        lines = f.read().splitlines()
+    header, rows = lines[0], lines[1:row_count + 1]
+    for idx in range(len(rows), row_count):
+        name = f"Filler{idx:05d}Service"
+        rows.append(f"{idx + 1},{name},Service,Users,Users.Application.Services,{name}Tests.cs,Pending,0,"
+                    f"Users.Application/Services/{name}.cs")
+    with open(detailed_csv, 'w', encoding='utf-8-sig', newline='') as f:
+        f.write("\r\n".join([header] + rows) + "\r\n")
+
+def prepare_workspace(workspace, args):
+    """Copy the scripts next to a synthetic C# tree"""
+    for script in BASE_PATH.glob("*.py"):
+        shutil.copy2(script, workspace / script.name)
+    write_csharp_tree(workspace, args.components)
+    print(f"Wrote {args.components} C# components")
+
+def write_stage_inputs(workspace, args):
+    """TRX files and the padded CSV, once generate has written the test files and CSVs"""
+    projects = write_trx_files(workspace, args.trx_results)
+    write_detailed_csv(workspace, args.csv_rows)
+    print(f"Wrote {args.trx_results} test results in {projects} TRX files and {args.csv_rows} CSV rows")
+
+def stage_generate():
+    """Scan the components, write the CSVs and merge the test stubs"""
+    import generate_unit_tests
+    return lambda: generate_unit_tests.main([])
+
+def stage_parse_trx():
+    """Parse every TRX file without the ingestion cache"""
+    import run_tests_and_update_excel
+    return lambda: run_tests_and_update_excel.parse_trx_files(use_cache=False)
+
+def stage_update_csv():
+    """Match parsed results to the CSV rows and rewrite the CSVs"""
+    import run_tests_and_update_excel
+    test_results = run_tests_and_update_excel.parse_trx_files(use_cache=False)
+    return lambda: run_tests_and_update_excel.update_csv_with_results(test_results)
+
+def stage_create_excel():
+    """Build the workbook from the CSVs"""
+    import create_excel_statistics
+    return lambda: create_excel_statistics.create_excel_statistics()
+
+STAGES = {
+    "generate": stage_generate,
+    "parse_trx": stage_parse_trx,
+    "update_csv": stage_update_csv,
+    "create_excel": stage_create_excel,
+}
+
+def run_stage(workspace, name, trace_allocations=False):
+    """Run one stage in this process (inside the workspace) and measure it"""
+    # The stages write next to the scripts, so never run them on the real tree
+    if BASE_PATH.resolve() != Path(workspace).resolve():
+        raise RuntimeError(f"Stages only run from the copy of this script inside the workspace, not {BASE_PATH}")
+    os.chdir(workspace)
+    with contextlib.redirect_stdout(io.StringIO()):
+        run = STAGES[name]()
+        setup_rss = peak_rss_mb()
+        if trace_allocations:
+            import tracemalloc
+            tracemalloc.start()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        run()
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+    
+    measurement = {
+        "wall_s": round(wall, 4),
+        "cpu_s": round(cpu, 4),
+        "setup_rss_mb": setup_rss,
+        "peak_rss_mb": peak_rss_mb()
+    }
+    if trace_allocations:
+        measurement["python_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 1)
+        tracemalloc.stop()
+    return measurement
+
+def run_stage_process(workspace, name, trace_allocations=False):
+    """Run one stage in a fresh interpreter so its memory is measured on its own"""
+    # The workspace copy of this script imports the workspace copies of the modules
+    command = [sys.executable, str(workspace / Path(__file__).name), "--run-stage", name, "--workspace", str(workspace)]
+    if trace_allocations:
+        command.append("--tracemalloc")
+    result = subprocess.run(command, capture_output=True, text=True, cwd=workspace)
+    if result.returncode != 0:
+        raise RuntimeError(f"Stage {name} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def summarize(runs):
+    """Aggregate the repeated measurements of one stage"""
+    walls = [run["wall_s"] for run in runs]
+    rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+    return {
+        "runs": runs,
+        "wall_s_first": walls[0],
+        "wall_s_min": min(walls),
+        "wall_s_median": round(statistics.median(walls), 4),
+        "peak_rss_mb_max": max(rss) if rss else None
+    }
+
+def run_benchmark(workspace, args):
+    """Prepare the inputs and run every selected stage `repeat` times"""
+    prepare_workspace(workspace, args)
+    if "generate" not in args.stages:
+        # The other stages need the generated test files and CSVs
+        run_stage_process(workspace, "generate")
+        write_stage_inputs(workspace, args)
+    
+    stages = {}
+    for name in STAGE_NAMES:
+        if name not in args.stages:
+            continue
+        runs = [run_stage_process(workspace, name, args.tracemalloc) for _ in range(args.repeat)]
+        if name == "generate":
+            # generate rewrites the CSV, so the padded one is written after its last run
+            write_stage_inputs(workspace, args)
+        stages[name] = summarize(runs)
+        print(f"  - {name}: {stages[name]['wall_s_min']:.3f}s (min of {args.repeat}), "
+              f"peak RSS {stages[name]['peak_rss_mb_max']} MB")
+    
+    return {
+        "version": BENCHMARK_VERSION,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": run_history.current_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {
+            "components": args.components,
+            "trx_results": args.trx_results,
+            "csv_rows": args.csv_rows,
+            "repeat": args.repeat
+        },
+        "stages": stages
+    }
+
+def compare(report, baseline, threshold):
+    """Print the change of every stage against a baseline; returns the regressed stages"""
+    sizes = {key: value for key, value in report["parameters"].items() if key != "repeat"}
+    baseline_sizes = {key: value for key, value in baseline.get("parameters", {}).items() if key != "repeat"}
+    if baseline_sizes != sizes:
+        print(f"Warning: baseline inputs {baseline_sizes} differ from {sizes}")
+    regressions = []
+    for name, stage in report["stages"].items():
+        old = baseline.get("stages", {}).get(name)
+        if not old:
+            continue
+        ratio = stage["wall_s_min"] / old["wall_s_min"] if old["wall_s_min"] else 1.0
+        line = f"  - {name}: {old['wall_s_min']:.3f}s -> {stage['wall_s_min']:.3f}s ({(ratio - 1) * 100:+.1f}%)"
+        if old.get("peak_rss_mb_max") and stage.get("peak_rss_mb_max"):
+            line += f", peak RSS {old['peak_rss_mb_max']} -> {stage['peak_rss_mb_max']} MB"
+        if ratio > 1 + threshold:
+            line += "  REGRESSION"
+            regressions.append(name)
+        print(line)
+    return regressions
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Benchmark the statistics pipeline on synthetic inputs")
+    parser.add_argument("--components", type=int, default=300, help="C# services, controllers and repositories (default: 300)")
+    parser.add_argument("--trx-results", type=int, default=20000, help="Test results spread over the TRX files (default: 20000)")
+    parser.add_argument("--csv-rows", type=int, default=2000, help="Rows of the detailed CSV (default: 2000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the first one starts without caches (default: 3)")
+    parser.add_argument("--stages", nargs="+", choices=STAGE_NAMES, default=STAGE_NAMES, help="Stages to run (default: all)")
+    parser.add_argument("--tracemalloc", action="store_true", help="Also report the peak of Python allocations (slower)")
+    parser.add_argument("--output", type=Path, default=BENCHMARK_FILE, help="JSON results file (default: benchmark_results.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier JSON results to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown counted as a regression (default: 0.2 = 20%%)")
+    parser.add_argument("--keep-workspace", action="store_true", help="Keep the generated workspace and print its path")
+    # Internal: run a single stage inside a prepared workspace
+    parser.add_argument("--run-stage", choices=STAGE_NAMES, help=argparse.SUPPRESS)
+    parser.add_argument("--workspace", type=Path, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Run the benchmark and write the JSON results"""
+    args = parse_args(argv)
+    if args.run_stage:
+        print(json.dumps(run_stage(args.workspace, args.run_stage, args.tracemalloc)))
+        return
+    
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    
+    workspace = Path(tempfile.mkdtemp(prefix="labooking-bench-"))
+    try:
+        report = run_benchmark(workspace, args)
+    finally:
+        if args.keep_workspace:
+            print(f"Workspace kept at {workspace}")
+        else:
+            shutil.rmtree(workspace, ignore_errors=True)
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Benchmark results written to {args.output}")
+    
+    if baseline is not None and compare(report, baseline, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
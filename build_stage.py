@@ -0,0 +1,142 @@
+"""
+Build stage that runs before the --no-build test runs.
+
+A project is outdated when one of its sources (.cs, .csproj) is newer than
+its output assembly, or when a project it references gets rebuilt. Only
+outdated projects are built: level by level so every project is built
+after the projects it references, and the projects of one level in
+parallel with `dotnet build --no-dependencies` so no two builds ever write
+the same referenced project.
+"""
+import os
+import time
+import asyncio
+
+from project_graph import dependents
+from source_watcher import snapshot
+from dotnet_runner import run_process
+import profiling
+
+BUILD_CONFIGURATION = "Debug"
+
+def output_assemblies(project):
+    """Assemblies a build of the project writes (bin and intermediate obj copy)"""
+    project_dir = project["csproj"].parent
+    file_name = f"{project['assembly_name']}.dll"
+    return [
+        project_dir / "bin" / BUILD_CONFIGURATION / project["target_framework"] / file_name,
+        project_dir / "obj" / BUILD_CONFIGURATION / project["target_framework"] / file_name,
+    ]
+
+def is_outdated(project):
+    """Whether a source of the project is newer than its last build output"""
+    output_mtimes = [path.stat().st_mtime_ns for path in output_assemblies(project) if path.exists()]
+    if not output_mtimes:
+        return True
+    newest_input = max(snapshot([project["csproj"].parent]).values(), default=0)
+    return newest_input > max(output_mtimes)
+
+def required_projects(test_projects, projects):
+    """The test projects plus everything they reference, directly or not"""
+    required = set()
+    pending = [csproj.stem for csproj in test_projects]
+    while pending:
+        name = pending.pop()
+        if name in required or name not in projects:
+            continue
+        required.add(name)
+        pending.extend(projects[name]["references"])
+    return required
+
+def outdated_projects(test_projects, projects, force=False):
+    """Projects to build so every test project has up to date binaries"""
+    required = required_projects(test_projects, projects)
+    if force:
+        return required
+    stale = {name for name in required if is_outdated(projects[name])}
+    return dependents(stale, {name: projects[name] for name in required})
+
+def build_levels(names, projects):
+    """Group projects so each group only references projects of earlier groups"""
+    levels = {}
+
+    def level_of(name):
+        if name not in levels:
+            references = [ref for ref in projects[name]["references"] if ref in names]
+            levels[name] = 1 + max((level_of(ref) for ref in references), default=-1)
+        return levels[name]
+    
+    grouped = {}
+    for name in sorted(names):
+        grouped.setdefault(level_of(name), []).append(name)
+    return [grouped[level] for level in sorted(grouped)]
+
+async def build_project(name, project, cwd, semaphore, timeout):
+    """Build one project without its references"""
+    command = [
+        "dotnet", "build", str(project["csproj"]),
+        "--no-dependencies",
+        "--configuration", BUILD_CONFIGURATION,
+        "--nologo"
+    ]
+    async with semaphore:
+        result = await run_process(command, cwd, lambda line: None, timeout)
+    result["project"] = name
+    profiling.add_span("dotnet build", result["start"], result["duration"], name, returncode=result["returncode"])
+    if result["timed_out"]:
+        status = "timed out"
+    elif result["returncode"] == 0:
+        status = "built"
+    else:
+        status = f"build failed (exit code {result['returncode']})"
+    print(f"  - {name}: {status} ({result['duration']:.1f}s)", flush=True)
+    return result
+
+async def build_projects(names, projects, cwd, jobs, timeout):
+    """Build projects level by level, skipping those whose references failed"""
+    semaphore = asyncio.Semaphore(jobs)
+    results = []
+    failed = set()
+    for level in build_levels(names, projects):
+        runnable = []
+        for name in level:
+            if failed.intersection(projects[name]["references"]):
+                print(f"  - {name}: skipped (a referenced project failed to build)")
+                failed.add(name)
+            else:
+                runnable.append(name)
+        level_results = await asyncio.gather(
+            *(build_project(name, projects[name], cwd, semaphore, timeout) for name in runnable)
+        )
+        failed.update(result["project"] for result in level_results if result["returncode"] != 0)
+        results.extend(level_results)
+    return results, failed
+
+def build_outdated(test_projects, projects, cwd, jobs=None, timeout=None, force=False):
+    """Build what the test projects need; returns a summary with the failed projects"""
+    start = time.perf_counter()
+    to_build = outdated_projects(test_projects, projects, force)
+    required = required_projects(test_projects, projects)
+    summary = {
+        "built": [],
+        "failed": set(),
+        "up_to_date": len(required) - len(to_build),
+        "duration": 0.0
+    }
+    if not to_build:
+        print(f"All {len(required)} projects are up to date.")
+        summary["duration"] = time.perf_counter() - start
+        return summary
+    
+    jobs = jobs or os.cpu_count() or 1
+    print(f"Building {len(to_build)} outdated projects ({summary['up_to_date']} up to date) with {jobs} parallel jobs...")
+    results, failed = asyncio.run(build_projects(to_build, projects, cwd, jobs, timeout))
+    for result in results:
+        if result["returncode"] != 0:
+            print(f"Build errors in {result['project']}: {(result['stdout'] + result['stderr'])[-1000:]}")
+    summary.update(
+        built=[result["project"] for result in results if result["returncode"] == 0],
+        failed=failed,
+        duration=time.perf_counter() - start
+    )
+    return summary
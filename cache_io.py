@@ -0,0 +1,27 @@
+"""
+Versioned JSON sidecar files shared by the caches next to the solution
+(TRX ingestion, project graph, signatures and test results).
+
+A cache that is missing, unreadable or written with another version is
+treated as empty, so a format change only costs one slower run.
+"""
+import json
+
+def load_json_cache(cache_file, version, description):
+    """Contents of a cache file, or None if it is missing, unreadable or of another version"""
+    if not cache_file.exists():
+        return None
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable {description} {cache_file}: {e}")
+        return None
+    if not isinstance(cache, dict) or cache.get("version") != version:
+        return None
+    return cache
+
+def save_json_cache(cache_file, version, **contents):
+    """Write a cache file tagged with its version"""
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump({"version": version, **contents}, f, indent=1)
@@ -0,0 +1,155 @@
+"""
+Line and branch coverage from the Cobertura XML written by coverlet.collector.
+
+`dotnet test --collect "XPlat Code Coverage"` writes
+<Project>/TestResults/<guid>/coverage.cobertura.xml. The newest report of
+each test project is read with iterparse, one <class> at a time, and the
+lines of every source file are merged across reports (a file covered by
+several test projects counts as covered by any of them).
+"""
+import re
+import csv
+from pathlib import Path, PurePosixPath
+from collections import defaultdict
+
+BASE_PATH = Path(__file__).parent
+COVERAGE_FILE_NAME = "coverage.cobertura.xml"
+COVERAGE_HEADERS = [
+    "No", "Component Name", "Type", "Module", "File Path",
+    "Lines Covered", "Lines Total", "Line Coverage %",
+    "Branches Covered", "Branches Total", "Branch Coverage %"
+]
+
+# condition-coverage="50% (1/2)"
+CONDITION_RE = re.compile(r'\((\d+)/(\d+)\)')
+
+def find_coverage_files():
+    """Newest Cobertura report of each test project"""
+    latest = {}
+    for coverage_file in BASE_PATH.glob(f"*/TestResults/*/{COVERAGE_FILE_NAME}"):
+        project_dir = coverage_file.parent.parent.parent
+        mtime = coverage_file.stat().st_mtime_ns
+        if project_dir not in latest or mtime > latest[project_dir][0]:
+            latest[project_dir] = (mtime, coverage_file)
+    return [coverage_file for _, coverage_file in sorted(latest.values(), key=lambda item: str(item[1]))]
+
+def iter_cobertura_lines(coverage_file):
+    """Yield (source file, line number, hits, branches covered, branches total)"""
+    # The XML parser is only loaded by the scripts that read coverage
+    import xml.etree.ElementTree as ET
+    
+    sources = []
+    parents = []
+    filename = None
+    for event, elem in ET.iterparse(coverage_file, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "class":
+                filename = elem.get("filename", "").replace("\\", "/")
+            parents.append(elem)
+            continue
+        
+        parents.pop()
+        if elem.tag == "source" and elem.text:
+            sources.append(elem.text.strip().replace("\\", "/"))
+        elif elem.tag == "line" and len(parents) >= 2 and parents[-2].tag == "class":
+            # Only the class-level <lines>; each method repeats its own lines
+            covered = total = 0
+            if elem.get("branch") == "True":
+                condition = CONDITION_RE.search(elem.get("condition-coverage", ""))
+                if condition:
+                    covered, total = int(condition.group(1)), int(condition.group(2))
+            path = filename
+            if sources and not PurePosixPath(path).is_absolute() and not re.match(r'^[A-Za-z]:/', path):
+                path = sources[0].rstrip("/") + "/" + path
+            yield path, int(elem.get("number", 0)), int(elem.get("hits", 0)), covered, total
+        elif elem.tag == "class" and parents:
+            # Done with this class: drop it so the tree never grows
+            parents[-1].remove(elem)
+
+def merge_line(lines, number, hits, covered, total):
+    """Add one line's hits and branch counts to a file's line map"""
+    if number in lines:
+        line = lines[number]
+        line[0] += hits
+        line[1] = max(line[1], covered)
+        line[2] = max(line[2], total)
+    else:
+        lines[number] = [hits, covered, total]
+
+def load_coverage(coverage_files=None):
+    """Merge Cobertura reports into {source path: {line: [hits, branches covered, branches total]}}"""
+    import xml.etree.ElementTree as ET
+    
+    coverage = defaultdict(dict)
+    for coverage_file in coverage_files if coverage_files is not None else find_coverage_files():
+        try:
+            for path, number, hits, covered, total in iter_cobertura_lines(coverage_file):
+                merge_line(coverage[path], number, hits, covered, total)
+        except ET.ParseError as e:
+            print(f"Error parsing {coverage_file}: {e}")
+    return coverage
+
+def file_totals(lines):
+    """(lines covered, lines total, branches covered, branches total) of one file"""
+    return (
+        sum(1 for line in lines.values() if line[0] > 0),
+        len(lines),
+        sum(line[1] for line in lines.values()),
+        sum(line[2] for line in lines.values())
+    )
+
+def coverage_by_row(components, coverage):
+    """Coverage totals for each component (None when its file was not instrumented)"""
+    # Reports hold absolute paths from the machine that ran the tests, so
+    # match on the trailing parts of the path, which is what the CSV stores
+    row_index = {}
+    for row_idx, component in enumerate(components):
+        row_index[component.file_path.replace("\\", "/").lower()] = row_idx
+    
+    # Reports from different machines name the same file differently
+    row_lines = defaultdict(dict)
+    for path, lines in coverage.items():
+        parts = path.lower().split("/")
+        for length in range(1, len(parts) + 1):
+            row_idx = row_index.get("/".join(parts[-length:]))
+            if row_idx is not None:
+                for number, (hits, covered, total) in lines.items():
+                    merge_line(row_lines[row_idx], number, hits, covered, total)
+                break
+    
+    row_coverage = [None] * len(components)
+    for row_idx, lines in row_lines.items():
+        row_coverage[row_idx] = file_totals(lines)
+    return row_coverage
+
+def percent(part, total):
+    """Format a coverage ratio, N/A when there is nothing to cover"""
+    return f"{(part / total * 100):.1f}%" if total > 0 else "N/A"
+
+def coverage_values(component):
+    """Coverage row of a component, in COVERAGE_HEADERS order"""
+    lines_covered, lines_total, branches_covered, branches_total = component.coverage or (0, 0, 0, 0)
+    return [
+        component.number,
+        component.name,
+        component.type,
+        component.module,
+        component.file_path,
+        lines_covered,
+        lines_total,
+        percent(lines_covered, lines_total),
+        branches_covered,
+        branches_total,
+        percent(branches_covered, branches_total)
+    ]
+
+def write_coverage_csv(components):
+    """Write per-component line and branch coverage"""
+    coverage_csv = BASE_PATH / "Unit_Test_Coverage.csv"
+    with open(coverage_csv, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(COVERAGE_HEADERS)
+        writer.writerows(coverage_values(component) for component in components)
+    
+    instrumented = sum(bool(component.coverage and component.coverage[1]) for component in components)
+    print(f"Updated {coverage_csv} ({instrumented} of {len(components)} components instrumented)")
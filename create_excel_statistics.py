@@ -1,348 +1,299 @@
 """
 Script to create Excel file with unit test statistics
 """
-import csv
+import argparse
 from pathlib import Path
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 from datetime import datetime
 
+import run_history
+import profiling
+from coverage_report import COVERAGE_HEADERS, coverage_values
+from flaky_tests import FLAKY_HEADERS
+from statistics_model import TestStatistics, DETAILED_HEADERS, PERFORMANCE_HEADERS
+
 BASE_PATH = Path(__file__).parent
 
-def read_csv_data(csv_file):
-    """Read data from CSV file"""
-    data = []
-    with open(csv_file, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            data.append(row)
-    return data
+# Columns of the Summary sheet (the summary CSV also has Tests Passed)
+SUMMARY_SHEET_HEADERS = ["Category", "Count", "Tests Created", "Coverage %", "Branch Coverage %"]
+TRENDS_HEADERS = ["Run", "Timestamp", "Commit", "Components", "Tests", "Passed", "Failed", "Skipped", "Pass Rate"]
+TRENDS_RUNS = 100
 
-def create_excel_statistics():
-    """Create Excel file with test statistics"""
-    # Read CSV data
-    detailed_csv = BASE_PATH / "Unit_Test_Statistics_Detailed.csv"
-    summary_csv = BASE_PATH / "Unit_Test_Statistics_Summary.csv"
-    
-    if not detailed_csv.exists() or not summary_csv.exists():
-        print("CSV files not found. Please run generate_unit_tests.py first.")
-        return
-    
-    detailed_data = read_csv_data(detailed_csv)
-    summary_data = read_csv_data(summary_csv)
-    
-    # Create workbook
-    wb = Workbook()
-    
-    # Remove default sheet
-    if "Sheet" in wb.sheetnames:
-        wb.remove(wb["Sheet"])
-    
-    # Styles
-    header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
+# Per-type sheets: (sheet name, title, component types)
+TYPE_SHEETS = [
+    ("Services", "Services Unit Tests", ["Service", "SagaService"]),
+    ("Controllers", "Controllers Unit Tests", ["Controller"]),
+    ("Repositories", "Repositories Unit Tests", ["Repository"]),
+]
+
+def register_named_styles(wb):
+    """Register the shared named styles once per workbook"""
     border = Border(
         left=Side(style='thin'),
         right=Side(style='thin'),
         top=Side(style='thin'),
         bottom=Side(style='thin')
     )
+    center = Alignment(horizontal="center")
+    fill_even = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
     
-    # Summary Sheet
-    summary_sheet = wb.create_sheet("Summary", 0)
-    summary_headers = ["Category", "Count", "Tests Created", "Coverage %"]
-    
-    # Add title
-    summary_sheet.merge_cells('A1:D1')
-    title_cell = summary_sheet['A1']
-    title_cell.value = "UNIT TEST STATISTICS SUMMARY"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    title_cell.fill = PatternFill(start_color="2E5090", end_color="2E5090", fill_type="solid")
-    title_cell.font = Font(bold=True, color="FFFFFF", size=14)
-    
-    # Add headers
-    summary_sheet.append([])
-    summary_sheet.append(summary_headers)
-    
-    # Style headers
-    for col in range(1, len(summary_headers) + 1):
-        cell = summary_sheet.cell(3, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = border
-    
-    # Add summary data
-    for row_data in summary_data:
-        row = [
-            row_data["Category"],
-            int(row_data["Count"]),
-            int(row_data["Tests Created"]),
-            row_data["Coverage %"]
-        ]
-        summary_sheet.append(row)
+    styles = [
+        NamedStyle(
+            name="stats_title",
+            font=Font(bold=True, color="FFFFFF", size=14),
+            fill=PatternFill(start_color="2E5090", end_color="2E5090", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center")
+        ),
+        NamedStyle(
+            name="stats_header",
+            font=Font(bold=True, color="FFFFFF", size=11),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center", vertical="center"),
+            border=border
+        ),
+        NamedStyle(name="stats_cell", font=DEFAULT_FONT, border=border),
+        NamedStyle(name="stats_cell_bold", border=border, font=Font(bold=True)),
+        NamedStyle(name="stats_cell_center", font=DEFAULT_FONT, border=border, alignment=center),
+        NamedStyle(name="stats_cell_even", font=DEFAULT_FONT, border=border, fill=fill_even),
+        NamedStyle(name="stats_cell_even_center", font=DEFAULT_FONT, border=border, fill=fill_even, alignment=center),
+    ]
+    for style in styles:
+        wb.add_named_style(style)
+
+class SheetWriter:
+    """Append styled rows to a sheet, tracking column widths as values are written"""
     
-    # Style data rows
-    for row in range(4, 4 + len(summary_data)):
-        for col in range(1, len(summary_headers) + 1):
-            cell = summary_sheet.cell(row, col)
-            cell.border = border
-            if col == 1:
-                cell.font = Font(bold=True)
-            elif col in [2, 3]:
-                cell.alignment = Alignment(horizontal="center")
+    def __init__(self, sheet, num_columns, max_width, write_only=False):
+        self.sheet = sheet
+        self.num_columns = num_columns
+        self.max_width = max_width
+        self.write_only = write_only
+        self.row_idx = 0
+        self.max_lengths = [0] * num_columns
+        self.widths_applied = False
     
-    # Auto-adjust column widths
-    for col in range(1, len(summary_headers) + 1):
-        max_length = 0
-        column = get_column_letter(col)
-        for cell in summary_sheet[column]:
-            try:
-                if cell.value and len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max(max_length + 2, 12), 50)
-        summary_sheet.column_dimensions[column].width = adjusted_width
+    def track(self, values):
+        """Record value lengths for the column widths"""
+        max_lengths = self.max_lengths
+        for col, value in enumerate(values[:self.num_columns]):
+            if value:
+                length = len(str(value))
+                if length > max_lengths[col]:
+                    max_lengths[col] = length
     
-    # Detailed Sheet - All Components
-    detailed_sheet = wb.create_sheet("All Components")
-    detailed_headers = ["No", "Component Name", "Type", "Module", "Namespace", "Test File", "Status", "Test Count", "File Path"]
+    def apply_column_widths(self):
+        """Set each column to its longest value, clamped to [12, max_width]"""
+        for col, max_length in enumerate(self.max_lengths, 1):
+            self.sheet.column_dimensions[get_column_letter(col)].width = min(max(max_length + 2, 12), self.max_width)
+        self.widths_applied = True
     
-    # Add title
-    detailed_sheet.merge_cells('A1:I1')
-    title_cell = detailed_sheet['A1']
-    title_cell.value = "DETAILED UNIT TEST STATISTICS"
-    title_cell.font = Font(bold=True, size=14)
-    title_cell.alignment = Alignment(horizontal="center", vertical="center")
-    title_cell.fill = PatternFill(start_color="2E5090", end_color="2E5090", fill_type="solid")
-    title_cell.font = Font(bold=True, color="FFFFFF", size=14)
+    def append(self, values, styles=None):
+        """Append a row, applying a named style (or None) to each cell"""
+        self.row_idx += 1
+        styles = styles or [None] * len(values)
+        if not self.widths_applied:
+            self.track(values)
+        
+        if self.write_only:
+            row = []
+            for value, style in zip(values, styles):
+                cell = WriteOnlyCell(self.sheet, value=value)
+                if style:
+                    cell.style = style
+                row.append(cell)
+            self.sheet.append(row)
+            return
+        
+        # sheet.max_row rescans every cell, so the row number is tracked here
+        for col, (value, style) in enumerate(zip(values, styles), 1):
+            cell = self.sheet.cell(self.row_idx, col, value)
+            if style:
+                cell.style = style
+
+def write_table_sheet(wb, sheet_name, title, headers, rows, cell_styles, max_width,
+                      merge_title=False, write_only=False, index=None):
+    """Write a titled table sheet: title row, blank row, header row and data rows"""
+    with profiling.span(f"sheet {sheet_name}", rows=len(rows)):
+        sheet = wb.create_sheet(sheet_name, index)
+        writer = SheetWriter(sheet, len(headers), max_width, write_only)
+        
+        if write_only:
+            # Write-only sheets emit <cols> with the first row, so measure the
+            # values before anything is written
+            for values in [[title], headers] + rows:
+                writer.track(values)
+            writer.apply_column_widths()
+        
+        # Title row, merged across the table for the main sheets
+        title_style = "stats_title" if merge_title else None
+        writer.append([title], [title_style])
+        if merge_title:
+            sheet.merged_cells.add(f"A1:{get_column_letter(len(headers))}1")
+        
+        writer.append([])
+        writer.append(headers, ["stats_header"] * len(headers))
+        
+        for idx, row in enumerate(rows):
+            writer.append(row, cell_styles(idx))
+        
+        if not writer.widths_applied:
+            writer.apply_column_widths()
+        return sheet
+
+def summary_cell_styles(idx):
+    """Summary rows: bold category, centered counts"""
+    return ["stats_cell_bold", "stats_cell_center", "stats_cell_center", "stats_cell", "stats_cell"]
+
+def detailed_cell_styles(idx):
+    """All Components rows: zebra striping, centered No/Status/Test Count"""
+    even = "_even" if idx % 2 == 0 else ""
+    centered = {0, 6, 7}
+    return [
+        f"stats_cell{even}_center" if col in centered else f"stats_cell{even}"
+        for col in range(len(DETAILED_HEADERS))
+    ]
+
+def type_cell_styles(idx):
+    """Per-type rows: zebra striping only"""
+    even = "_even" if idx % 2 == 0 else ""
+    return [f"stats_cell{even}"] * len(DETAILED_HEADERS)
+
+def performance_cell_styles(idx):
+    """Performance rows: zebra striping, centered numbers"""
+    even = "_even" if idx % 2 == 0 else ""
+    return [
+        f"stats_cell{even}_center" if col >= 3 else f"stats_cell{even}"
+        for col in range(len(PERFORMANCE_HEADERS))
+    ]
+
+def coverage_cell_styles(idx):
+    """Coverage rows: zebra striping, centered No and numbers"""
+    even = "_even" if idx % 2 == 0 else ""
+    return [
+        f"stats_cell{even}_center" if col == 0 or col >= 5 else f"stats_cell{even}"
+        for col in range(len(COVERAGE_HEADERS))
+    ]
+
+def trends_cell_styles(idx):
+    """Trends rows: zebra striping, centered counts"""
+    even = "_even" if idx % 2 == 0 else ""
+    return [
+        f"stats_cell{even}_center" if col != 1 else f"stats_cell{even}"
+        for col in range(len(TRENDS_HEADERS))
+    ]
+
+def flaky_cell_styles(idx):
+    """Flaky rows: zebra striping, centered classification and counts"""
+    even = "_even" if idx % 2 == 0 else ""
+    return [
+        f"stats_cell{even}_center" if 2 <= col <= 5 else f"stats_cell{even}"
+        for col in range(len(FLAKY_HEADERS))
+    ]
+
+def detailed_row(component, number):
+    """Convert a component into sheet values"""
+    return [number] + component.to_row()[1:]
+
+def create_excel_statistics(write_only=False, statistics=None):
+    """Create Excel file with test statistics"""
+    # Statistics handed over by the calling script, otherwise read from the CSV files
+    if statistics is None:
+        statistics = TestStatistics.from_csv(reports=True)
+    if statistics is None:
+        print("CSV files not found. Please run generate_unit_tests.py first.")
+        return
     
-    # Add headers
-    detailed_sheet.append([])
-    detailed_sheet.append(detailed_headers)
+    # Create workbook; write-only workbooks stream rows to disk and start empty
+    wb = Workbook(write_only=write_only)
     
-    # Style headers
-    for col in range(1, len(detailed_headers) + 1):
-        cell = detailed_sheet.cell(3, col)
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = border
+    # Remove default sheet
+    if "Sheet" in wb.sheetnames:
+        wb.remove(wb["Sheet"])
     
-    # Add detailed data
-    for idx, row_data in enumerate(detailed_data, 1):
-        row = [
-            int(row_data["No"]),
-            row_data["Component Name"],
-            row_data["Type"],
-            row_data["Module"],
-            row_data["Namespace"],
-            row_data["Test File"],
-            row_data["Status"],
-            int(row_data["Test Count"]),
-            row_data["File Path"]
-        ]
-        detailed_sheet.append(row)
+    register_named_styles(wb)
     
-    # Style data rows with alternating colors
-    fill_even = PatternFill(start_color="F2F2F2", end_color="F2F2F2", fill_type="solid")
-    for row in range(4, 4 + len(detailed_data)):
-        for col in range(1, len(detailed_headers) + 1):
-            cell = detailed_sheet.cell(row, col)
-            cell.border = border
-            if (row - 4) % 2 == 0:
-                cell.fill = fill_even
-            if col == 1:
-                cell.alignment = Alignment(horizontal="center")
-            elif col in [7, 8]:
-                cell.alignment = Alignment(horizontal="center")
+    # Summary Sheet
+    summary_rows = [
+        [summary.category, summary.count, summary.tests_created, summary.coverage, summary.branch_coverage]
+        for summary in statistics.summary
+    ]
+    write_table_sheet(
+        wb, "Summary", "UNIT TEST STATISTICS SUMMARY", SUMMARY_SHEET_HEADERS, summary_rows,
+        summary_cell_styles, max_width=50, merge_title=True, write_only=write_only, index=0
+    )
     
-    # Auto-adjust column widths
-    for col in range(1, len(detailed_headers) + 1):
-        max_length = 0
-        column = get_column_letter(col)
-        for cell in detailed_sheet[column]:
-            try:
-                if cell.value and len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max(max_length + 2, 12), 80)
-        detailed_sheet.column_dimensions[column].width = adjusted_width
+    # Detailed Sheet - All Components
+    detailed_rows = [component.to_row() for component in statistics.components]
+    write_table_sheet(
+        wb, "All Components", "DETAILED UNIT TEST STATISTICS", DETAILED_HEADERS, detailed_rows,
+        detailed_cell_styles, max_width=80, merge_title=True, write_only=write_only
+    )
     
     # Create separate sheets by type
-    types = {}
-    for row_data in detailed_data:
-        comp_type = row_data["Type"]
-        if comp_type not in types:
-            types[comp_type] = []
-        types[comp_type].append(row_data)
+    for sheet_name, title, comp_types in TYPE_SHEETS:
+        components = statistics.by_type(comp_types)
+        if not components:
+            continue
+        rows = [detailed_row(component, idx) for idx, component in enumerate(components, 1)]
+        write_table_sheet(
+            wb, sheet_name, title, DETAILED_HEADERS, rows,
+            type_cell_styles, max_width=80, write_only=write_only
+        )
     
-    # Services Sheet
-    if "Service" in types or "SagaService" in types:
-        services_sheet = wb.create_sheet("Services")
-        services = [r for r in detailed_data if r["Type"] in ["Service", "SagaService"]]
-        
-        services_sheet.append(["Services Unit Tests"])
-        services_sheet.append([])
-        services_sheet.append(detailed_headers)
-        
-        # Style headers
-        for col in range(1, len(detailed_headers) + 1):
-            cell = services_sheet.cell(3, col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
-        
-        # Add services data
-        for idx, row_data in enumerate(services, 1):
-            row = [
-                idx,
-                row_data["Component Name"],
-                row_data["Type"],
-                row_data["Module"],
-                row_data["Namespace"],
-                row_data["Test File"],
-                row_data["Status"],
-                int(row_data["Test Count"]),
-                row_data["File Path"]
-            ]
-            services_sheet.append(row)
-        
-        # Style data rows
-        for row in range(4, 4 + len(services)):
-            for col in range(1, len(detailed_headers) + 1):
-                cell = services_sheet.cell(row, col)
-                cell.border = border
-                if (row - 4) % 2 == 0:
-                    cell.fill = fill_even
-        
-        # Auto-adjust column widths
-        for col in range(1, len(detailed_headers) + 1):
-            max_length = 0
-            column = get_column_letter(col)
-            for cell in services_sheet[column]:
-                try:
-                    if cell.value and len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max(max_length + 2, 12), 80)
-            services_sheet.column_dimensions[column].width = adjusted_width
+    # Performance Sheet, once run_tests_and_update_excel.py has timed a run
+    if statistics.performance is not None:
+        write_table_sheet(
+            wb, "Performance", "TEST PERFORMANCE", PERFORMANCE_HEADERS, statistics.performance,
+            performance_cell_styles, max_width=80, merge_title=True, write_only=write_only
+        )
     
-    # Controllers Sheet
-    if "Controller" in types:
-        controllers_sheet = wb.create_sheet("Controllers")
-        controllers = [r for r in detailed_data if r["Type"] == "Controller"]
-        
-        controllers_sheet.append(["Controllers Unit Tests"])
-        controllers_sheet.append([])
-        controllers_sheet.append(detailed_headers)
-        
-        # Style headers
-        for col in range(1, len(detailed_headers) + 1):
-            cell = controllers_sheet.cell(3, col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
-        
-        # Add controllers data
-        for idx, row_data in enumerate(controllers, 1):
-            row = [
-                idx,
-                row_data["Component Name"],
-                row_data["Type"],
-                row_data["Module"],
-                row_data["Namespace"],
-                row_data["Test File"],
-                row_data["Status"],
-                int(row_data["Test Count"]),
-                row_data["File Path"]
-            ]
-            controllers_sheet.append(row)
-        
-        # Style data rows
-        for row in range(4, 4 + len(controllers)):
-            for col in range(1, len(detailed_headers) + 1):
-                cell = controllers_sheet.cell(row, col)
-                cell.border = border
-                if (row - 4) % 2 == 0:
-                    cell.fill = fill_even
-        
-        # Auto-adjust column widths
-        for col in range(1, len(detailed_headers) + 1):
-            max_length = 0
-            column = get_column_letter(col)
-            for cell in controllers_sheet[column]:
-                try:
-                    if cell.value and len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max(max_length + 2, 12), 80)
-            controllers_sheet.column_dimensions[column].width = adjusted_width
+    # Coverage Sheet, once run_tests_and_update_excel.py --coverage has run
+    if statistics.has_coverage:
+        coverage_rows = [coverage_values(component) for component in statistics.components]
+        write_table_sheet(
+            wb, "Coverage", "CODE COVERAGE BY COMPONENT", COVERAGE_HEADERS, coverage_rows,
+            coverage_cell_styles, max_width=80, merge_title=True, write_only=write_only
+        )
     
-    # Repositories Sheet
-    if "Repository" in types:
-        repos_sheet = wb.create_sheet("Repositories")
-        repos = [r for r in detailed_data if r["Type"] == "Repository"]
-        
-        repos_sheet.append(["Repositories Unit Tests"])
-        repos_sheet.append([])
-        repos_sheet.append(detailed_headers)
-        
-        # Style headers
-        for col in range(1, len(detailed_headers) + 1):
-            cell = repos_sheet.cell(3, col)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center", vertical="center")
-            cell.border = border
-        
-        # Add repos data
-        for idx, row_data in enumerate(repos, 1):
-            row = [
-                idx,
-                row_data["Component Name"],
-                row_data["Type"],
-                row_data["Module"],
-                row_data["Namespace"],
-                row_data["Test File"],
-                row_data["Status"],
-                int(row_data["Test Count"]),
-                row_data["File Path"]
+    # Trends Sheet, from the run history kept by run_tests_and_update_excel.py
+    if run_history.HISTORY_DB.exists():
+        conn = run_history.connect()
+        trends_rows = [
+            [
+                run["id"],
+                run["timestamp"],
+                (run["commit_sha"] or "")[:10],
+                run["components"],
+                run["tests"],
+                run["passed"],
+                run["failed"],
+                run["skipped"],
+                f"{run_history.pass_rate(run['passed'], run['tests']) * 100:.1f}%"
             ]
-            repos_sheet.append(row)
-        
-        # Style data rows
-        for row in range(4, 4 + len(repos)):
-            for col in range(1, len(detailed_headers) + 1):
-                cell = repos_sheet.cell(row, col)
-                cell.border = border
-                if (row - 4) % 2 == 0:
-                    cell.fill = fill_even
-        
-        # Auto-adjust column widths
-        for col in range(1, len(detailed_headers) + 1):
-            max_length = 0
-            column = get_column_letter(col)
-            for cell in repos_sheet[column]:
-                try:
-                    if cell.value and len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max(max_length + 2, 12), 80)
-            repos_sheet.column_dimensions[column].width = adjusted_width
+            for run in run_history.run_trends(conn, limit=TRENDS_RUNS)
+        ]
+        conn.close()
+        write_table_sheet(
+            wb, "Trends", f"TEST TRENDS (LAST {TRENDS_RUNS} RUNS)", TRENDS_HEADERS, trends_rows,
+            trends_cell_styles, max_width=30, merge_title=True, write_only=write_only
+        )
+    
+    # Flaky Sheet, from the stability report of run_tests_and_update_excel.py
+    if statistics.flaky is not None:
+        flaky_rows = [[row_data[header] for header in FLAKY_HEADERS] for row_data in statistics.flaky]
+        write_table_sheet(
+            wb, "Flaky", "FLAKY AND BROKEN TESTS", FLAKY_HEADERS, flaky_rows,
+            flaky_cell_styles, max_width=80, merge_title=True, write_only=write_only
+        )
     
     # Save Excel file
     excel_file = BASE_PATH / "Unit_Test_Statistics.xlsx"
-    wb.save(excel_file)
+    with profiling.span("save workbook"):
+        wb.save(excel_file)
     print(f"\nExcel file created successfully: {excel_file}")
     print(f"Generated at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"\nSheets created:")
@@ -354,6 +305,30 @@ def create_excel_statistics():
     
     return excel_file
 
-if __name__ == "__main__":
-    create_excel_statistics()
+class ExcelSink:
+    """Builds the workbook from the statistics handed to it"""
+    
+    def __init__(self, write_only=False):
+        self.write_only = write_only
+    
+    def write(self, statistics):
+        return create_excel_statistics(write_only=self.write_only, statistics=statistics)
 
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Create Excel file with unit test statistics")
+    parser.add_argument(
+        "--streaming",
+        action="store_true",
+        help="Use openpyxl write-only mode to stream rows to disk (for large reports)"
+    )
+    profiling.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    with profiling.session(args, "create_excel_statistics"):
+        return create_excel_statistics(write_only=args.streaming)
+
+if __name__ == "__main__":
+    main()
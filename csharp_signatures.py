@@ -0,0 +1,196 @@
+"""
+Lightweight C# signature extractor used to generate test stubs.
+
+Not a real C# parser: comments and string literals are blanked out, then
+regular expressions pick out usings, the namespace, the constructor and
+public methods of the class named after the file. That is enough for the
+service/controller/repository classes in this solution and runs in a few
+milliseconds for the whole tree.
+"""
+import re
+from pathlib import Path
+
+from cache_io import load_json_cache, save_json_cache
+from file_hashing import data_sha256
+
+BASE_PATH = Path(__file__).parent
+SIGNATURE_CACHE_FILE = BASE_PATH / ".signature_cache.json"
+SIGNATURE_CACHE_VERSION = 1
+
+# Comments, verbatim/interpolated/regular strings and char literals, in the
+# order they have to be tried so e.g. "//" inside a string is not a comment
+TOKEN_RE = re.compile(
+    r'//[^\n]*'
+    r'|/\*.*?\*/'
+    r'|\$?@"(?:[^"]|"")*"'
+    r'|@?\$?"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])+'",
+    re.DOTALL
+)
+
+USING_RE = re.compile(r'^\s*using\s+(?!static\b)([\w.]+)\s*;', re.MULTILINE)
+NAMESPACE_RE = re.compile(r'\bnamespace\s+([\w.]+)')
+MODIFIERS = r'(?:(?:static|virtual|override|async|new|sealed|abstract|extern|unsafe|partial)\s+)*'
+METHOD_RE = re.compile(
+    r'\bpublic\s+(' + MODIFIERS + r')'
+    r'([\w.]+(?:\s*<[\w\s,.<>?\[\]()]*>)?(?:\s*\[\s*\])*\??)\s+'
+    r'(\w+)\s*(?:<[\w\s,]*>)?\s*\('
+)
+
+def blank_literals(source):
+    """Replace comments and string/char literals with spaces, keeping offsets"""
+    def repl(match):
+        text = match.group(0)
+        if text.startswith("/"):
+            return re.sub(r'[^\n]', ' ', text)
+        # Keep the quotes so expressions stay balanced, blank the contents
+        return text[0] + re.sub(r'[^\n]', ' ', text[1:-1]) + text[-1]
+    return TOKEN_RE.sub(repl, source)
+
+def find_matching(text, start, open_char, close_char):
+    """Return the index of the bracket closing the one at text[start]"""
+    depth = 0
+    for idx in range(start, len(text)):
+        char = text[idx]
+        if char == open_char:
+            depth += 1
+        elif char == close_char:
+            depth -= 1
+            if depth == 0:
+                return idx
+    return len(text) - 1
+
+def split_top_level(text, separator=","):
+    """Split on separators that are not nested inside <>, () or []"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char in "<([":
+            depth += 1
+        elif char in ">)]":
+            depth -= 1
+        if char == separator and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if "".join(current).strip():
+        parts.append("".join(current))
+    return parts
+
+def parse_parameters(text):
+    """Parse a parameter list into (type, name) pairs"""
+    parameters = []
+    for part in split_top_level(text):
+        # Drop attributes ([FromBody]), defaults and parameter modifiers
+        part = re.sub(r'\[[^\]]*\]', ' ', part).split("=")[0].strip()
+        part = re.sub(r'^(?:this|ref|out|in|params)\s+', '', part)
+        if not part:
+            continue
+        type_name, _, name = part.rpartition(" ")
+        parameters.append((re.sub(r'\s+', ' ', type_name.strip()), name.strip()))
+    return parameters
+
+def extract_signatures(source, class_name):
+    """Extract usings, namespace, constructor dependencies and public methods"""
+    usings = USING_RE.findall(source)
+    code = blank_literals(source)
+    namespace_match = NAMESPACE_RE.search(code)
+
+    # Files are named after their class, but a few are not (e.g.
+    # UserWithLawyerService.cs holds UserWithLawyerProfileService)
+    class_match = re.search(r'\bclass\s+(' + re.escape(class_name) + r')\b', code)
+    if not class_match:
+        class_match = re.search(r'\bpublic\s+(?:(?:sealed|partial|static)\s+)*class\s+(\w+)', code)
+    if not class_match:
+        return None
+    class_name = class_match.group(1)
+
+    # A C# 12 primary constructor sits right after the class name
+    dependencies = []
+    header_end = code.find("{", class_match.end())
+    if header_end == -1:
+        return None
+    paren = re.match(r'\s*(?:<[^>]*>)?\s*\(', code[class_match.end():header_end])
+    if paren:
+        open_idx = class_match.end() + paren.end() - 1
+        dependencies = parse_parameters(code[open_idx + 1:find_matching(code, open_idx, "(", ")")])
+
+    body_end = find_matching(code, header_end, "{", "}")
+    body = code[header_end + 1:body_end]
+
+    # Only members declared directly in the class body (depth 0) count
+    depth_at = []
+    depth = 0
+    for char in body:
+        depth_at.append(depth)
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+
+    constructor_re = re.compile(r'\bpublic\s+' + re.escape(class_name) + r'\s*\(')
+    for match in constructor_re.finditer(body):
+        if depth_at[match.start()] != 0:
+            continue
+        open_idx = match.end() - 1
+        params = parse_parameters(body[open_idx + 1:find_matching(body, open_idx, "(", ")")])
+        # Several constructors: DI picks the one with the most parameters
+        if len(params) > len(dependencies):
+            dependencies = params
+
+    methods = []
+    for match in METHOD_RE.finditer(body):
+        if depth_at[match.start()] != 0:
+            continue
+        modifiers, return_type, name = match.group(1).split(), match.group(2), match.group(3)
+        if name == class_name or return_type in ("class", "interface", "record", "struct", "enum", "event", "delegate"):
+            continue
+        open_idx = match.end() - 1
+        close_idx = find_matching(body, open_idx, "(", ")")
+        methods.append({
+            "name": name,
+            "return_type": re.sub(r'\s+', ' ', return_type),
+            "is_async": "async" in modifiers or return_type.startswith(("Task", "ValueTask")),
+            "is_static": "static" in modifiers,
+            "parameters": parse_parameters(body[open_idx + 1:close_idx])
+        })
+
+    return {
+        "class_name": class_name,
+        "namespace": namespace_match.group(1) if namespace_match else None,
+        "usings": usings,
+        "dependencies": dependencies,
+        "methods": methods
+    }
+
+def load_signature_cache():
+    """Load cached signatures keyed by file content hash"""
+    cache = load_json_cache(SIGNATURE_CACHE_FILE, SIGNATURE_CACHE_VERSION, "signature cache")
+    return cache.get("files", {}) if cache else {}
+
+def save_signature_cache(entries):
+    """Write the signature cache next to the solution"""
+    save_json_cache(SIGNATURE_CACHE_FILE, SIGNATURE_CACHE_VERSION, files=entries)
+
+def extract_all_signatures(components, use_cache=True):
+    """Extract signatures for scanned components, reading each file once"""
+    cache = load_signature_cache() if use_cache else {}
+    new_cache = {}
+    signatures = {}
+
+    for component in components:
+        file_path = component["file_path"]
+        data = (BASE_PATH / file_path).read_bytes()
+        digest = data_sha256(data)
+        # Cached (type, name) pairs come back from JSON as lists, which index the same way
+        key = f"{digest}:{component['name']}"
+        if key in cache:
+            signature = cache[key]
+        else:
+            signature = extract_signatures(data.decode('utf-8-sig', errors='replace'), component["name"])
+        new_cache[key] = signature
+        signatures[file_path] = signature
+
+    if use_cache:
+        save_signature_cache(new_cache)
+    return signatures
@@ -0,0 +1,313 @@
+"""
+Asynchronous dotnet test runner with live output and per-project timeouts.
+
+Each test project runs in its own `dotnet test` process. Output is read
+line by line as it is produced: test outcomes update the per-project
+counters shown on the progress line, failures are printed immediately and
+only the last lines of each stream are kept for the summary. A project
+exceeding its timeout has its whole process tree (test host included)
+killed; the other projects keep running and keep their results.
+"""
+import os
+import re
+import sys
+import time
+import signal
+import asyncio
+import subprocess
+from collections import deque
+
+import profiling
+
+# "  Passed Namespace.Class.Method [12 ms]" with the console logger at normal verbosity
+TEST_OUTCOME_RE = re.compile(r'^\s*(Passed|Failed|Skipped)\s+\S')
+# "Passed!  - Failed: 0, Passed: 12, Skipped: 0, Total: 12, Duration: 1 s - X.Tests.dll"
+TEST_SUMMARY_RE = re.compile(r'\b(?:Passed|Failed)!\s+-\s+Failed:\s+(\d+),\s+Passed:\s+(\d+),\s+Skipped:\s+(\d+)')
+OUTPUT_TAIL_LINES = 200
+STREAM_LIMIT = 1024 * 1024
+# Seconds to finish reading the pipes once the process tree is gone or killed
+DRAIN_TIMEOUT = 10
+
+class ProjectProgress:
+    """Status and test counters of one test project"""
+    __slots__ = ("state", "passed", "failed", "skipped", "start")
+
+    def __init__(self):
+        self.state = "queued"
+        self.passed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.start = None
+
+class ProgressBoard:
+    """Live status line with per-project progress and overall counters"""
+
+    def __init__(self, project_names, stream_output=False):
+        self.projects = {name: ProjectProgress() for name in project_names}
+        self.stream_output = stream_output
+        # Redraw in place on a terminal, print a status line now and then in CI logs
+        self.live = sys.stdout.isatty()
+        self.interval = 0.2 if self.live else 15.0
+        self.last_render = 0.0
+        self.status_width = 0
+
+    def status(self):
+        """One-line summary of the run"""
+        done = sum(p.state not in ("queued", "running") for p in self.projects.values())
+        passed = sum(p.passed for p in self.projects.values())
+        failed = sum(p.failed for p in self.projects.values())
+        skipped = sum(p.skipped for p in self.projects.values())
+        running = [
+            f"{name} ({progress.passed + progress.failed + progress.skipped})"
+            for name, progress in self.projects.items() if progress.state == "running"
+        ]
+        line = f"[{done}/{len(self.projects)} done] {passed} passed, {failed} failed, {skipped} skipped"
+        if running:
+            line += " | running: " + ", ".join(running)
+        return line
+
+    def clear(self):
+        """Erase the live status line"""
+        if self.live and self.status_width:
+            sys.stdout.write("\r" + " " * self.status_width + "\r")
+            self.status_width = 0
+
+    def render(self, force=False):
+        """Redraw the status line, at most every `interval` seconds"""
+        now = time.monotonic()
+        if not force and now - self.last_render < self.interval:
+            return
+        self.last_render = now
+        line = self.status()
+        if self.live:
+            self.clear()
+            sys.stdout.write(line)
+            sys.stdout.flush()
+            self.status_width = len(line)
+        else:
+            print(line, flush=True)
+
+    def print(self, text):
+        """Print a line above the status line"""
+        self.clear()
+        print(text, flush=True)
+        if self.live:
+            self.render(force=True)
+
+    def start(self, name):
+        """Mark a project as running"""
+        progress = self.projects[name]
+        progress.state = "running"
+        progress.start = time.monotonic()
+        self.render()
+
+    def output_line(self, name, line):
+        """Count test outcomes from one line of dotnet test output"""
+        progress = self.projects[name]
+        outcome = TEST_OUTCOME_RE.match(line)
+        summary = TEST_SUMMARY_RE.search(line)
+        if summary:
+            # The final summary is authoritative (e.g. with quiet console output)
+            progress.failed, progress.passed, progress.skipped = (int(value) for value in summary.groups())
+        elif outcome:
+            field = outcome.group(1).lower()
+            setattr(progress, field, getattr(progress, field) + 1)
+        
+        if self.stream_output:
+            self.print(f"[{name}] {line}")
+        elif outcome and outcome.group(1) == "Failed":
+            self.print(f"  ! {name}: {line.strip()}")
+        self.render()
+
+    def finish(self, name, result):
+        """Record a finished project and print its result line"""
+        progress = self.projects[name]
+        if result["timed_out"]:
+            progress.state, status = "timeout", "timed out"
+        elif result["returncode"] == 0:
+            progress.state, status = "ok", "OK"
+        else:
+            progress.state, status = "failed", f"exit code {result['returncode']}"
+        self.print(
+            f"  - {name}: {status} ({result['duration']:.1f}s, "
+            f"{progress.passed} passed, {progress.failed} failed, {progress.skipped} skipped)"
+        )
+
+def build_test_command(csproj, trx_file, results_dir, build=False, test_filter=None, collect_coverage=False):
+    """dotnet test command line for one project"""
+    command = ["dotnet", "test", str(csproj)]
+    if not build:
+        command.append("--no-build")
+    if test_filter:
+        command += ["--filter", test_filter]
+    if collect_coverage:
+        # coverlet.collector writes TestResults/<guid>/coverage.cobertura.xml
+        command += ["--collect", "XPlat Code Coverage"]
+    command += [
+        "--logger", f"trx;LogFileName={trx_file.name}",
+        # Normal verbosity prints one line per test, which drives the live counters
+        "--logger", "console;verbosity=normal",
+        "--results-directory", str(results_dir)
+    ]
+    return command
+
+class WindowsJob:
+    """Windows job object holding a process and every process it starts"""
+
+    def __init__(self, pid):
+        import ctypes
+        from ctypes import wintypes
+        self.kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        self.kernel32.CreateJobObjectW.restype = wintypes.HANDLE
+        self.kernel32.OpenProcess.restype = wintypes.HANDLE
+        self.kernel32.AssignProcessToJobObject.argtypes = [wintypes.HANDLE, wintypes.HANDLE]
+        self.kernel32.TerminateJobObject.argtypes = [wintypes.HANDLE, wintypes.UINT]
+        self.kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+        self.handle = self.kernel32.CreateJobObjectW(None, None)
+        # PROCESS_SET_QUOTA | PROCESS_TERMINATE, the rights AssignProcessToJobObject needs
+        process_handle = self.kernel32.OpenProcess(0x0100 | 0x0001, False, pid)
+        assigned = bool(self.handle and process_handle) and self.kernel32.AssignProcessToJobObject(self.handle, process_handle)
+        if process_handle:
+            self.kernel32.CloseHandle(process_handle)
+        if not assigned:
+            self.close()
+
+    def kill(self):
+        """Terminate every process in the job; False when the job could not be set up"""
+        return bool(self.handle) and bool(self.kernel32.TerminateJobObject(self.handle, 1))
+
+    def close(self):
+        """Release the job handle (the processes keep running)"""
+        if self.handle:
+            self.kernel32.CloseHandle(self.handle)
+            self.handle = None
+
+def kill_process_tree(process, job=None):
+    """Kill a dotnet test process together with the test host it started"""
+    if os.name == "nt":
+        # Processes started by dotnet join its job, so the test host is
+        # killed even after dotnet exited and taskkill /T cannot find it
+        if job is not None and job.kill():
+            return
+        if process.returncode is None:
+            subprocess.run(["taskkill", "/T", "/F", "/PID", str(process.pid)], capture_output=True)
+    else:
+        # The process leads its own session, so the group holds the test host
+        # too, and outlives dotnet when a hung host keeps the pipes open
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+async def read_lines(stream, tail, on_line):
+    """Pass every line of a process stream to on_line, keeping the last few"""
+    while True:
+        try:
+            line = await stream.readline()
+        except ValueError:
+            # readline() drops a line longer than STREAM_LIMIT; keep reading
+            continue
+        if not line:
+            break
+        text = line.decode('utf-8', errors='replace').rstrip("\r\n")
+        tail.append(text)
+        on_line(text)
+
+async def run_process(command, cwd, on_line, timeout=None):
+    """Run a command, passing each output line to on_line; kill its process tree on timeout"""
+    stdout_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    stderr_tail = deque(maxlen=OUTPUT_TAIL_LINES)
+    timed_out = False
+    start = time.perf_counter()
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            cwd=cwd,
+            limit=STREAM_LIMIT,
+            start_new_session=os.name != "nt"
+        )
+    except Exception as e:
+        returncode = -1
+        stderr_tail.append(str(e))
+    else:
+        job = WindowsJob(process.pid) if os.name == "nt" else None
+        readers = asyncio.gather(
+            read_lines(process.stdout, stdout_tail, on_line),
+            read_lines(process.stderr, stderr_tail, on_line)
+        )
+        try:
+            await asyncio.wait_for(asyncio.shield(readers), timeout)
+        except asyncio.TimeoutError:
+            timed_out = True
+            kill_process_tree(process, job)
+            stderr_tail.append(f"Killed after {timeout:.0f}s timeout")
+        except asyncio.CancelledError:
+            kill_process_tree(process, job)
+            raise
+        finally:
+            # Killing the tree closes the pipes, so the readers end promptly;
+            # a process escaping the kill must not block the run forever
+            try:
+                await asyncio.wait_for(readers, DRAIN_TIMEOUT)
+            except asyncio.TimeoutError:
+                stderr_tail.append(f"Stopped reading output {DRAIN_TIMEOUT}s after the process tree was killed")
+            returncode = await process.wait()
+            if job is not None:
+                job.close()
+    
+    return {
+        "returncode": returncode,
+        "timed_out": timed_out,
+        "stdout": "\n".join(stdout_tail),
+        "stderr": "\n".join(stderr_tail),
+        "start": start,
+        "duration": time.perf_counter() - start
+    }
+
+async def run_test_project(csproj, board, cwd, build=False, test_filter=None, results_dir=None, timeout=None,
+                           collect_coverage=False, on_finished=None):
+    """Run a single test project, streaming its output and writing its own TRX file"""
+    project_name = csproj.stem
+    results_dir = results_dir or csproj.parent / "TestResults"
+    trx_file = results_dir / f"{project_name}.trx"
+    # The name is fixed, so a run that is killed or crashes must not leave
+    # the previous run's file behind to be collected as this run's results
+    trx_file.unlink(missing_ok=True)
+    command = build_test_command(csproj, trx_file, results_dir, build, test_filter, collect_coverage)
+    
+    board.start(project_name)
+    result = await run_process(command, cwd, lambda line: board.output_line(project_name, line), timeout)
+    result.update(project=project_name, trx_file=trx_file)
+    board.finish(project_name, result)
+    profiling.add_span(
+        "dotnet test", result["start"], result["duration"], project_name,
+        returncode=result["returncode"], timed_out=result["timed_out"]
+    )
+    if on_finished:
+        # e.g. hand the TRX file to a parser while the other projects still run
+        on_finished(result)
+    return result
+
+async def run_projects(projects, cwd, jobs, build=False, filters=None, results_root=None,
+                       timeout=None, stream_output=False, collect_coverage=False, on_finished=None):
+    """Run test projects with at most `jobs` dotnet processes at a time"""
+    board = ProgressBoard([csproj.stem for csproj in projects], stream_output)
+    semaphore = asyncio.Semaphore(jobs)
+    
+    async def run_one(csproj):
+        async with semaphore:
+            return await run_test_project(
+                csproj, board, cwd, build,
+                (filters or {}).get(csproj),
+                results_root / csproj.stem / "TestResults" if results_root else None,
+                timeout,
+                collect_coverage,
+                on_finished
+            )
+    
+    results = await asyncio.gather(*(run_one(csproj) for csproj in projects))
+    board.clear()
+    print(board.status())
+    return results
@@ -0,0 +1,17 @@
+"""
+Content hashes shared by the content-addressed caches: the TRX ingestion
+cache, the result cache and the signature cache.
+"""
+import hashlib
+
+def file_sha256(path):
+    """Hash a file in chunks so large files are never fully loaded"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def data_sha256(data):
+    """Hash file contents already read, giving the same digest as file_sha256"""
+    return hashlib.sha256(data).hexdigest()
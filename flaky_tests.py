@@ -0,0 +1,91 @@
+"""
+Classify tests as stable, flaky or broken from their recent outcomes.
+
+A test is flaky when, within the last runs, it failed and then passed on a
+rerun of the same run, or it went from failing to passing and back (or the
+other way round) across runs. A test failing every attempt of the latest
+run it took part in, without being flaky, is broken. Anything else that
+failed in the window has been fixed and is stable again.
+"""
+import csv
+from pathlib import Path
+
+BASE_PATH = Path(__file__).parent
+FLAKY_CSV = BASE_PATH / "Unit_Test_Flaky.csv"
+FLAKY_HEADERS = ["Test Name", "Project", "Classification", "Runs", "Failed Runs", "Recovered On Rerun", "Last Outcome"]
+# Runs looked back on when classifying
+STABILITY_WINDOW = 20
+
+def rerun_filter(test_names):
+    """dotnet test --filter expression selecting individual tests"""
+    # Theory cases are named with their arguments; the filter only knows the method
+    methods = sorted({name.split('(', 1)[0] for name in test_names})
+    return "|".join(f"FullyQualifiedName={method}" for method in methods)
+
+def run_state(outcome, recovered):
+    """'pass', 'fail', 'recovered' or None (not run) for one run of a test"""
+    if outcome == "Passed":
+        return "pass"
+    if outcome == "Failed":
+        return "recovered" if recovered else "fail"
+    return None
+
+def classify(runs):
+    """Classify a test from its (run id, outcome, reruns, recovered) history, oldest first"""
+    states = [state for state in (run_state(outcome, recovered) for _, outcome, _, recovered in runs) if state]
+    if not states:
+        return "stable"
+    if "recovered" in states:
+        return "flaky"
+    flips = sum(1 for previous, state in zip(states, states[1:]) if previous != state)
+    if flips >= 2:
+        return "flaky"
+    return "broken" if states[-1] == "fail" else "stable"
+
+def last_outcome(runs):
+    """How the latest run of a test ended"""
+    _, outcome, reruns, recovered = runs[-1]
+    if recovered:
+        return "Passed on rerun"
+    if outcome == "Failed" and reruns:
+        return f"Failed ({reruns + 1} attempts)"
+    return outcome
+
+def stability_rows(history):
+    """Report rows for every test in the history, flaky and broken first"""
+    order = {"flaky": 0, "broken": 1, "stable": 2}
+    rows = []
+    for (name, project), runs in history.items():
+        rows.append({
+            "Test Name": name,
+            "Project": project,
+            "Classification": classify(runs),
+            "Runs": len(runs),
+            "Failed Runs": sum(1 for _, outcome, _, _ in runs if outcome == "Failed"),
+            "Recovered On Rerun": sum(1 for *_, recovered in runs if recovered),
+            "Last Outcome": last_outcome(runs)
+        })
+    rows.sort(key=lambda row: (order[row["Classification"]], -row["Failed Runs"], row["Test Name"]))
+    return rows
+
+def read_flaky_csv():
+    """Rows of the last stability report, or None if none was written yet"""
+    if not FLAKY_CSV.exists():
+        return None
+    counts = ("Runs", "Failed Runs", "Recovered On Rerun")
+    with open(FLAKY_CSV, 'r', encoding='utf-8-sig') as f:
+        return [
+            {header: int(row[header]) if header in counts else row[header] for header in FLAKY_HEADERS}
+            for row in csv.DictReader(f)
+        ]
+
+def write_flaky_csv(rows):
+    """Write the stability report shown on the Flaky sheet"""
+    with open(FLAKY_CSV, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FLAKY_HEADERS)
+        writer.writeheader()
+        writer.writerows(rows)
+    
+    flaky = sum(row["Classification"] == "flaky" for row in rows)
+    broken = sum(row["Classification"] == "broken" for row in rows)
+    print(f"Updated {FLAKY_CSV} ({flaky} flaky, {broken} broken)")
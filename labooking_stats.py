@@ -0,0 +1,142 @@
+"""
+Single entry point for the unit test statistics tooling.
+
+  python labooking_stats.py scan [--check]   # count components (fast, for hooks)
+  python labooking_stats.py generate [--mode overwrite]
+  python labooking_stats.py test [--jobs 4 --coverage ...]
+  python labooking_stats.py report [--streaming]
+  python labooking_stats.py all [test options]
+
+Options after the subcommand go to the script it wraps. Only the modules a
+subcommand needs are imported inside it: `scan` never loads openpyxl, the
+XML parsers, asyncio or sqlite, so it answers within STARTUP_BUDGET_S.
+`--check-startup` measures that and fails when the budget is exceeded.
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+BASE_PATH = Path(__file__).parent
+# Wall time of `scan` in a fresh interpreter, interpreter start included
+STARTUP_BUDGET_S = 0.15
+STARTUP_RUNS = 5
+# Modules `scan` must not import
+HEAVY_MODULES = ["openpyxl", "xml.etree", "asyncio", "sqlite3", "concurrent.futures"]
+COMMANDS = ["scan", "generate", "test", "report", "all"]
+
+def scan(check=False):
+    """Print the component counts; with check, compare them with the detailed CSV"""
+    from generate_unit_tests import scan_components
+    components = scan_components()
+    for category in ["services", "controllers", "repositories"]:
+        print(f"Found {len(components[category])} {category}")
+    if not check:
+        return 0
+    
+    from statistics_model import TestStatistics, DETAILED_CSV
+    statistics = TestStatistics.from_csv()
+    if statistics is None:
+        print(f"{DETAILED_CSV.name} not found, run: python labooking_stats.py generate")
+        return 1
+    # The CSV keeps the separators of the machine that generated it
+    scanned = {
+        component["file_path"].replace("\\", "/") for items in components.values() for component in items
+    }
+    listed = {component.file_path.replace("\\", "/") for component in statistics.components}
+    for file_path in sorted(scanned - listed):
+        print(f"  new: {file_path}")
+    for file_path in sorted(listed - scanned):
+        print(f"  removed: {file_path}")
+    if scanned != listed:
+        print(f"{DETAILED_CSV.name} is out of date, run: python labooking_stats.py generate")
+        return 1
+    return 0
+
+def generate(argv):
+    """Scan the components, write the CSVs and the test stubs"""
+    import generate_unit_tests
+    generate_unit_tests.main(argv)
+    return 0
+
+def test(argv):
+    """Run the tests and update the CSVs and the workbook"""
+    import run_tests_and_update_excel
+    run_tests_and_update_excel.main(argv)
+    return 0
+
+def report(argv):
+    """Rebuild the workbook from the CSVs"""
+    import create_excel_statistics
+    return 0 if create_excel_statistics.main(argv) else 1
+
+def check_startup(budget=STARTUP_BUDGET_S, runs=STARTUP_RUNS):
+    """Time `scan` in fresh interpreters and list the heavy modules it imported"""
+    import subprocess
+    command = [sys.executable, str(BASE_PATH / Path(__file__).name), "scan"]
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, capture_output=True, check=True, cwd=BASE_PATH)
+        timings.append(time.perf_counter() - start)
+    
+    # -X importtime lists every module imported, one per stderr line
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime"] + command[1:], capture_output=True, text=True, check=True, cwd=BASE_PATH
+    )
+    imported = {line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines() if "|" in line}
+    heavy = sorted(name for name in imported if any(name == module or name.startswith(module + ".") for module in HEAVY_MODULES))
+    
+    fastest = min(timings)
+    print(f"scan startup: {fastest * 1000:.0f} ms (min of {runs}), budget {budget * 1000:.0f} ms")
+    if heavy:
+        print(f"scan imported heavy modules: {', '.join(heavy)}")
+    return 0 if fastest <= budget and not heavy else 1
+
+def parse_args(argv=None):
+    """Parse the subcommand; the remaining options belong to the wrapped script"""
+    parser = argparse.ArgumentParser(
+        description="Unit test statistics: scan components, generate tests, run them and report",
+        epilog="Options after the subcommand are passed to the script it runs",
+        # `scan --check` must not be taken for an abbreviation of --check-startup
+        allow_abbrev=False
+    )
+    parser.add_argument("command", nargs="?", choices=COMMANDS, help="scan, generate, test, report or all (generate + test)")
+    parser.add_argument(
+        "--check-startup",
+        action="store_true",
+        help=f"Measure the startup time of scan against the budget ({STARTUP_BUDGET_S * 1000:.0f} ms)"
+    )
+    parser.add_argument("script_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.command is None and not args.check_startup:
+        parser.error("a subcommand is required")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    script_args = args.script_args
+    if args.check_startup:
+        return check_startup()
+    
+    if args.command == "scan":
+        scan_parser = argparse.ArgumentParser(prog="labooking_stats.py scan", description="Count the components")
+        scan_parser.add_argument(
+            "--check",
+            action="store_true",
+            help="Exit with 1 when components were added or removed since the detailed CSV was generated"
+        )
+        return scan(scan_parser.parse_args(script_args).check)
+    if args.command == "generate":
+        return generate(script_args)
+    if args.command == "test":
+        return test(script_args)
+    if args.command == "report":
+        return report(script_args)
+    
+    # all: the test run also regenerates the workbook
+    generate([])
+    return test(script_args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Timing spans for the statistics scripts, printed as a summary or written as
+a Chrome trace.
+
+  python run_tests_and_update_excel.py --profile --trace run_trace.json
+  python generate_unit_tests.py --cprofile generate.prof
+
+The scripts wrap their stages in `span(name)`. Spans nest per thread and
+record the peak RSS of the process when they end. Intervals timed
+elsewhere, like the dotnet processes run side by side on the event loop,
+are added with `add_span` on a lane of their own. Without --profile,
+--trace or --cprofile no profiler is active and `span` does nothing. The
+trace uses the Chrome trace-event format, which chrome://tracing and
+https://ui.perfetto.dev open directly.
+"""
+import os
+import sys
+import json
+import time
+import threading
+import contextlib
+from collections import defaultdict
+
+try:
+    import resource
+except ImportError:
+    # Not available on Windows; peak RSS is then left out
+    resource = None
+
+# Spans shorter than this are left out of the printed summary (not the trace)
+SUMMARY_MIN_S = 0.001
+# Slowest child process intervals listed in the printed summary
+SUMMARY_PROCESSES = 10
+
+_profiler = None
+_NO_SPAN = contextlib.nullcontext()
+
+def peak_rss_mb(who=None):
+    """Peak resident set size in MB of this process (or of its finished children), or None"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF if who is None else who).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+class Span:
+    """One timed interval; path holds the names of the enclosing spans"""
+    __slots__ = ("name", "path", "lane", "start", "end", "args")
+
+    def __init__(self, name, path, lane, start, end=None, args=None):
+        self.name = name
+        self.path = path
+        self.lane = lane
+        self.start = start
+        self.end = end
+        self.args = args or {}
+
+class Profiler:
+    """Collects the spans of one script run, from every thread"""
+
+    def __init__(self, cprofile=False):
+        self.spans = []
+        self.origin = time.perf_counter()
+        self.local = threading.local()
+        # Lane (thread name or process lane) -> trace thread id, in order of appearance
+        self.lanes = {}
+        self.thread_lanes = set()
+        self.cprofile = None
+        if cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def lane_id(self, lane):
+        """Small stable thread id of a lane for the trace"""
+        return self.lanes.setdefault(lane, len(self.lanes) + 1)
+    
+    @contextlib.contextmanager
+    def span(self, name, **args):
+        """Time the body as a span nested in the current thread's open spans"""
+        stack = self.local.__dict__.setdefault("stack", [])
+        lane = threading.current_thread().name
+        self.lane_id(lane)
+        self.thread_lanes.add(lane)
+        span = Span(name, tuple(stack) + (name,), lane, time.perf_counter(), args=args)
+        stack.append(name)
+        try:
+            yield span
+        finally:
+            stack.pop()
+            span.end = time.perf_counter()
+            span.args["peak_rss_mb"] = peak_rss_mb()
+            self.spans.append(span)
+
+    def add_span(self, name, start, duration, lane, **args):
+        """Record an interval timed elsewhere (perf_counter start, seconds) on its own lane"""
+        self.lane_id(lane)
+        self.spans.append(Span(name, (name,), lane, start, start + duration, args))
+
+    def stop(self):
+        """Stop the cProfile collector, if any"""
+        if self.cprofile is not None:
+            self.cprofile.disable()
+
+    def summary_lines(self):
+        """Indented span tree per thread (calls, total seconds, peak RSS), then the slowest processes"""
+        totals = defaultdict(lambda: [0, 0.0, None])
+        processes = []
+        for span in sorted(self.spans, key=lambda span: span.start):
+            if span.lane not in self.thread_lanes:
+                processes.append(span)
+                continue
+            total = totals[(span.lane, span.path)]
+            total[0] += 1
+            total[1] += span.end - span.start
+            rss = span.args.get("peak_rss_mb")
+            if rss is not None and (total[2] is None or rss > total[2]):
+                total[2] = rss
+        
+        lines = []
+        for lane in self.lanes:
+            if lane not in self.thread_lanes:
+                continue
+            lines.append(f"[{lane}]")
+            for (span_lane, path), (calls, seconds, rss) in totals.items():
+                if span_lane != lane or seconds < SUMMARY_MIN_S:
+                    continue
+                label = "  " * len(path) + path[-1] + (f" x{calls}" if calls > 1 else "")
+                line = f"{label:<60} {seconds:9.3f}s"
+                if rss is not None:
+                    line += f"  {rss:8.1f} MB"
+                lines.append(line)
+        
+        if processes:
+            lines.append(f"[child processes: {len(processes)}, {sum(span.end - span.start for span in processes):.3f}s in total]")
+            for span in sorted(processes, key=lambda span: span.start - span.end)[:SUMMARY_PROCESSES]:
+                lines.append(f"{'  ' + span.name + ' ' + span.lane:<60} {span.end - span.start:9.3f}s")
+        return lines
+
+    def print_summary(self):
+        """Print where the time went"""
+        print("\nProfile (seconds per span, peak RSS when the span ended):")
+        for line in self.summary_lines():
+            print(line)
+        children_rss = peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+        if children_rss:
+            print(f"Largest child process peak RSS: {children_rss:.1f} MB")
+
+    def trace_events(self):
+        """Chrome trace events: one complete event per span, lane names and an RSS counter"""
+        pid = os.getpid()
+        events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": os.path.basename(sys.argv[0])}}]
+        for lane, tid in self.lanes.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": lane}})
+        
+        for span in sorted(self.spans, key=lambda span: span.start):
+            start_us = round((span.start - self.origin) * 1e6, 1)
+            end_us = round((span.end - self.origin) * 1e6, 1)
+            events.append({
+                "name": span.name,
+                "cat": span.path[0],
+                "ph": "X",
+                "ts": start_us,
+                "dur": round(end_us - start_us, 1),
+                "pid": pid,
+                "tid": self.lanes[span.lane],
+                "args": {key: str(value) if not isinstance(value, (int, float)) else value
+                         for key, value in span.args.items() if value is not None}
+            })
+            rss = span.args.get("peak_rss_mb")
+            if rss is not None:
+                events.append({"name": "peak RSS (MB)", "ph": "C", "ts": end_us, "pid": pid, "args": {"rss": rss}})
+        return events
+
+    def write_trace(self, trace_file):
+        """Write the spans as Chrome trace-event JSON"""
+        with open(trace_file, 'w', encoding='utf-8') as f:
+            json.dump({"traceEvents": self.trace_events(), "displayTimeUnit": "ms"}, f)
+        print(f"Trace written to {trace_file} ({len(self.spans)} spans)")
+
+    def write_cprofile(self, cprofile_file):
+        """Dump the cProfile statistics (open with pstats or snakeviz)"""
+        self.cprofile.dump_stats(str(cprofile_file))
+        print(f"cProfile statistics written to {cprofile_file}")
+
+def span(name, **args):
+    """Time the body when a profiler is active"""
+    if _profiler is None:
+        return _NO_SPAN
+    return _profiler.span(name, **args)
+
+def add_span(name, start, duration, lane, **args):
+    """Record an interval timed elsewhere when a profiler is active"""
+    if _profiler is not None:
+        _profiler.add_span(name, start, duration, lane, **args)
+
+def add_arguments(parser):
+    """Add --profile, --trace and --cprofile to a script's parser"""
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time and peak memory of every stage at the end"
+    )
+    parser.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Write the stage timings as Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev)"
+    )
+    parser.add_argument(
+        "--cprofile",
+        metavar="FILE",
+        help="Also run cProfile on the main thread and dump its statistics to FILE"
+    )
+
+@contextlib.contextmanager
+def session(args, name):
+    """Profile the body as the span `name` when --profile, --trace or --cprofile was given"""
+    global _profiler
+    if _profiler is not None or not (args.profile or args.trace or args.cprofile):
+        # Not profiling, or already inside a profiled script
+        with span(name):
+            yield
+        return
+    
+    profiler = _profiler = Profiler(cprofile=bool(args.cprofile))
+    try:
+        with profiler.span(name):
+            yield
+    finally:
+        _profiler = None
+        profiler.stop()
+        if args.profile:
+            profiler.print_summary()
+        if args.trace:
+            profiler.write_trace(args.trace)
+        if args.cprofile:
+            profiler.write_cprofile(args.cprofile)
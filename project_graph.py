@@ -0,0 +1,196 @@
+"""
+Dependency graph of the projects in LawAppointmentApp.sln, used to find the
+test projects affected by a change.
+
+The solution and every .csproj (ProjectReference, PackageReference) are
+parsed into a graph that is cached next to the solution and only rebuilt
+when one of those files changes.
+"""
+import re
+import argparse
+import subprocess
+from pathlib import Path, PurePath
+from collections import defaultdict
+import xml.etree.ElementTree as ET
+
+from cache_io import load_json_cache, save_json_cache
+
+BASE_PATH = Path(__file__).parent
+SOLUTION_FILE = BASE_PATH / "LawAppointmentApp.sln"
+GRAPH_CACHE_FILE = BASE_PATH / ".project_graph_cache.json"
+GRAPH_CACHE_VERSION = 2
+
+# Project("{type guid}") = "Name", "Folder\Name.csproj", "{project guid}"
+SLN_PROJECT_RE = re.compile(r'^Project\("\{[^}]*\}"\)\s*=\s*"([^"]+)",\s*"([^"]+\.csproj)"', re.MULTILINE)
+
+# Files outside any project that change how every project builds
+GLOBAL_FILES = {
+    "Directory.Build.props",
+    "Directory.Build.targets",
+    "Directory.Packages.props",
+    "global.json",
+    "NuGet.config",
+    SOLUTION_FILE.name,
+}
+
+def solution_projects():
+    """Relative csproj paths of the projects listed in the solution"""
+    if not SOLUTION_FILE.exists():
+        return []
+    text = SOLUTION_FILE.read_text(encoding='utf-8-sig')
+    return [PurePath(path.replace("\\", "/")) for _, path in SLN_PROJECT_RE.findall(text)]
+
+def project_files():
+    """The solution's csproj files plus any not added to it yet"""
+    # Test projects created by generate_unit_tests.py only join the solution
+    # once add_tests_to_solution.ps1 has run
+    paths = {BASE_PATH / path for path in solution_projects()}
+    paths.update(BASE_PATH.glob("*/*.csproj"))
+    return sorted(path for path in paths if path.exists())
+
+def parse_project(csproj):
+    """ProjectReference names, PackageReference versions and output of a .csproj"""
+    references = []
+    packages = {}
+    root = ET.parse(csproj).getroot()
+    target_frameworks = root.findtext(".//TargetFramework") or root.findtext(".//TargetFrameworks") or ""
+    for reference in root.iter("ProjectReference"):
+        include = reference.get("Include")
+        if include:
+            references.append(PurePath(include.replace("\\", "/")).stem)
+    for package in root.iter("PackageReference"):
+        include = package.get("Include")
+        if include:
+            packages[include] = package.get("Version") or package.findtext("Version") or ""
+    return {
+        "csproj": csproj.relative_to(BASE_PATH).as_posix(),
+        "references": references,
+        "packages": packages,
+        "assembly_name": root.findtext(".//AssemblyName") or csproj.stem,
+        "target_framework": target_frameworks.split(";")[0].strip()
+    }
+
+def graph_fingerprint(paths):
+    """Size and mtime of every file the graph is built from"""
+    fingerprint = {}
+    for path in paths:
+        stat = path.stat()
+        fingerprint[path.relative_to(BASE_PATH).as_posix()] = [stat.st_size, stat.st_mtime_ns]
+    return fingerprint
+
+def load_graph_cache():
+    """Load the cached graph, or None if missing or outdated"""
+    return load_json_cache(GRAPH_CACHE_FILE, GRAPH_CACHE_VERSION, "project graph cache")
+
+def save_graph_cache(fingerprint, projects):
+    """Write the graph cache next to the solution"""
+    save_json_cache(GRAPH_CACHE_FILE, GRAPH_CACHE_VERSION, fingerprint=fingerprint, projects=projects)
+
+def load_projects(use_cache=True):
+    """Map every project to its csproj, project references and packages"""
+    paths = project_files()
+    if SOLUTION_FILE.exists():
+        paths.append(SOLUTION_FILE)
+    fingerprint = graph_fingerprint(paths)
+    
+    cache = load_graph_cache() if use_cache else None
+    if cache and cache["fingerprint"] == fingerprint:
+        projects = cache["projects"]
+    else:
+        projects = {
+            path.stem: parse_project(path)
+            for path in paths if path.suffix == ".csproj"
+        }
+        if use_cache:
+            save_graph_cache(fingerprint, projects)
+    
+    for project in projects.values():
+        project["csproj"] = BASE_PATH / project["csproj"]
+    return projects
+
+def project_of_file(path, projects):
+    """Project owning a file, i.e. the top-level folder holding its csproj"""
+    try:
+        rel_parts = Path(path).resolve().relative_to(BASE_PATH.resolve()).parts
+    except ValueError:
+        return None
+    if rel_parts and rel_parts[0] in projects:
+        return rel_parts[0]
+    return None
+
+def dependents(project_names, projects):
+    """The given projects plus every project referencing them, directly or not"""
+    referenced_by = defaultdict(list)
+    for name, project in projects.items():
+        for reference in project["references"]:
+            referenced_by[reference].append(name)
+    
+    seen = set(project_names)
+    pending = list(project_names)
+    while pending:
+        for name in referenced_by[pending.pop()]:
+            if name not in seen:
+                seen.add(name)
+                pending.append(name)
+    return seen
+
+def projects_using_package(package, projects):
+    """Projects with a direct PackageReference to a NuGet package"""
+    return sorted(name for name, project in projects.items() if package in project["packages"])
+
+def test_projects(projects):
+    """Csproj files of every test project"""
+    return sorted(project["csproj"] for name, project in projects.items() if name.endswith(".Tests"))
+
+def affected_test_projects(changed_files, projects):
+    """Test project csproj files that depend on any of the changed files"""
+    if any(Path(path).name in GLOBAL_FILES for path in changed_files):
+        return test_projects(projects)
+    
+    changed_projects = {project_of_file(path, projects) for path in changed_files}
+    changed_projects.discard(None)
+    return sorted(
+        projects[name]["csproj"]
+        for name in dependents(changed_projects, projects)
+        if name.endswith(".Tests")
+    )
+
+def git_lines(*args):
+    """Output lines of a git command run next to the solution"""
+    result = subprocess.run(["git", *args], capture_output=True, text=True, cwd=BASE_PATH)
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+    return [line for line in result.stdout.splitlines() if line]
+
+def changed_files_since(base_ref):
+    """Files changed between the merge base with base_ref and the working tree"""
+    merge_base = git_lines("merge-base", base_ref, "HEAD")[0]
+    # --relative keeps the paths relative to BASE_PATH even if the git root is above it
+    changed = git_lines("diff", "--name-only", "--relative", merge_base)
+    changed += git_lines("ls-files", "--others", "--exclude-standard")
+    return [BASE_PATH / path for path in changed]
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Show the solution's project graph or the test projects impacted by a change")
+    parser.add_argument("--base", help="List the test projects impacted by changes since this git ref (e.g. origin/main)")
+    parser.add_argument("--no-cache", action="store_true", help="Rebuild the graph instead of using the cache")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Print the impacted test projects, one per line, or the whole graph"""
+    args = parse_args(argv)
+    projects = load_projects(use_cache=not args.no_cache)
+    
+    if args.base:
+        for csproj in affected_test_projects(changed_files_since(args.base), projects):
+            print(csproj.relative_to(BASE_PATH).as_posix())
+        return
+    
+    for name, project in sorted(projects.items()):
+        print(f"{name}: {len(project['packages'])} packages")
+        for reference in project["references"]:
+            print(f"  -> {reference}")
+
+if __name__ == "__main__":
+    main()
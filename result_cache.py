@@ -0,0 +1,116 @@
+"""
+Local cache of test project results keyed by the project's inputs.
+
+The key of a test project hashes the sources (.cs, .csproj) of the project
+and of every project it references, directly or not, plus the files that
+change how every project builds. When a test project passed with the same
+key before and its TRX file is still in place, that TRX file is reused
+instead of running `dotnet test` again. Only successful runs are cached, so
+failing projects are always run again.
+"""
+import hashlib
+from pathlib import Path
+
+from project_graph import GLOBAL_FILES
+from cache_io import load_json_cache, save_json_cache
+from file_hashing import file_sha256
+from build_stage import required_projects
+from source_watcher import snapshot
+
+BASE_PATH = Path(__file__).parent
+RESULT_CACHE_FILE = BASE_PATH / ".test_result_cache.json"
+RESULT_CACHE_VERSION = 1
+
+class ResultCache:
+    """Input keys and reusable TRX files of the test projects"""
+
+    def __init__(self, projects, use_cache=True):
+        self.projects = projects
+        self.files = {}
+        self.entries = {}
+        self.keys = {}
+        if use_cache:
+            self.load()
+
+    def load(self):
+        """Read the cache file, starting empty if it is missing or outdated"""
+        cache = load_json_cache(RESULT_CACHE_FILE, RESULT_CACHE_VERSION, "result cache")
+        if cache:
+            self.files = cache["files"]
+            self.entries = cache["projects"]
+
+    def save(self):
+        """Write the cache file next to the solution"""
+        save_json_cache(RESULT_CACHE_FILE, RESULT_CACHE_VERSION, files=self.files, projects=self.entries)
+
+    def file_digest(self, path, mtime_ns, files):
+        """Content hash of a source file, only read again when its mtime changed"""
+        key = Path(path).relative_to(BASE_PATH).as_posix()
+        known = self.files.get(key)
+        if known and known[0] == mtime_ns:
+            files[key] = known
+        else:
+            files[key] = [mtime_ns, file_sha256(path)]
+        return key, files[key][1]
+
+    def compute_keys(self, test_projects):
+        """Hash the inputs of every test project"""
+        digests = {}
+        files = {}
+        for name in {name for csproj in test_projects for name in required_projects([csproj], self.projects)}:
+            project_dir = self.projects[name]["csproj"].parent
+            digests[name] = sorted(
+                self.file_digest(path, mtime_ns, files)
+                for path, mtime_ns in snapshot([project_dir]).items()
+            )
+        global_digests = sorted(
+            self.file_digest(path, path.stat().st_mtime_ns, files)
+            for path in (BASE_PATH / name for name in GLOBAL_FILES) if path.exists()
+        )
+        # Files of projects not involved this time keep their digests for later runs
+        self.files.update(files)
+        
+        for csproj in test_projects:
+            digest = hashlib.sha256()
+            for name in sorted(required_projects([csproj], self.projects)):
+                digest.update(f"{name}\n".encode('utf-8'))
+                for rel_path, file_digest in digests[name]:
+                    digest.update(f"{rel_path} {file_digest}\n".encode('utf-8'))
+            for rel_path, file_digest in global_digests:
+                digest.update(f"{rel_path} {file_digest}\n".encode('utf-8'))
+            self.keys[csproj.stem] = digest.hexdigest()
+
+    def lookup(self, test_projects, collect_coverage=False):
+        """Split test projects into those to run and {project: cached TRX file}"""
+        self.compute_keys([csproj for csproj in test_projects if csproj.stem in self.projects])
+        to_run = []
+        cached = {}
+        for csproj in test_projects:
+            entry = self.entries.get(csproj.stem)
+            trx_file = BASE_PATH / entry["trx"] if entry else None
+            if (
+                entry
+                and entry["key"] == self.keys.get(csproj.stem)
+                and (entry["coverage"] or not collect_coverage)
+                and trx_file.exists()
+                and trx_file.stat().st_mtime_ns == entry["trx_mtime_ns"]
+            ):
+                cached[csproj.stem] = trx_file
+            else:
+                to_run.append(csproj)
+        return to_run, cached
+
+    def record(self, run_results, collect_coverage=False):
+        """Remember the TRX files of the projects that passed"""
+        for result in run_results:
+            name = result["project"]
+            trx_file = result["trx_file"]
+            if result["returncode"] != 0 or name not in self.keys or not trx_file.exists():
+                self.entries.pop(name, None)
+                continue
+            self.entries[name] = {
+                "key": self.keys[name],
+                "trx": trx_file.relative_to(BASE_PATH).as_posix(),
+                "trx_mtime_ns": trx_file.stat().st_mtime_ns,
+                "coverage": collect_coverage
+            }
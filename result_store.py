@@ -0,0 +1,138 @@
+"""
+Per-test result store shared by the test statistics scripts
+"""
+import sys
+import heapq
+from pathlib import PurePath
+from collections import defaultdict
+
+class TestResult:
+    """One UnitTestResult from a TRX file"""
+    __slots__ = ("test_name", "class_name", "outcome", "duration", "start_time", "source", "flaky")
+
+    def __init__(self, test_name, class_name, outcome, duration, start_time, source):
+        self.test_name = test_name
+        self.class_name = class_name
+        self.outcome = outcome
+        self.duration = duration
+        self.start_time = start_time
+        self.source = source
+        # Set when the test failed but passed when rerun
+        self.flaky = False
+
+    def __repr__(self):
+        return f"TestResult({self.test_name!r}, {self.outcome!r}, {self.duration:.3f}s)"
+    
+    @property
+    def project(self):
+        """Test project the result came from (<Project>/TestResults/<run>.trx)"""
+        return project_of_source(self.source)
+
+def test_class_of(test_name):
+    """Extract the test class from a test name (format: Namespace.ClassName.MethodName)"""
+    # Theory cases carry their arguments, which may contain dots
+    method_path = test_name.split('(', 1)[0]
+    if '.' not in method_path:
+        return None
+    class_name = method_path.rsplit('.', 1)[0]
+    return class_name.split('+')[0]  # Handle nested classes
+
+def project_of_source(source):
+    """Name of the test project folder holding a TRX file"""
+    return PurePath(source.replace("\\", "/")).parent.parent.name
+
+def parse_duration(value):
+    """Convert a TRX duration (hh:mm:ss.fffffff) to seconds"""
+    if not value:
+        return 0.0
+    try:
+        hours, minutes, seconds = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return 0.0
+
+class TestResultStore:
+    """Compact list of per-test results with the aggregations the reports need"""
+
+    def __init__(self):
+        self.results = []
+
+    def __len__(self):
+        return len(self.results)
+
+    def __iter__(self):
+        return iter(self.results)
+
+    def add(self, test_name, outcome, duration=0.0, start_time="", source=""):
+        """Record one test result; results without a test class are ignored"""
+        class_name = test_class_of(test_name)
+        if class_name is None:
+            return
+        # Class names and sources repeat for every test, so share one string each
+        self.results.append(TestResult(
+            test_name, sys.intern(class_name), sys.intern(outcome),
+            duration, start_time, sys.intern(source)
+        ))
+
+    def extend(self, other):
+        """Append every result of another store"""
+        self.results.extend(other.results)
+
+    def class_counts(self):
+        """Aggregate total/passed/failed/skipped/flaky counters per test class"""
+        counts = defaultdict(lambda: {"total": 0, "passed": 0, "failed": 0, "skipped": 0, "flaky": 0})
+        for result in self.results:
+            class_counts = counts[result.class_name]
+            class_counts["total"] += 1
+            if result.flaky:
+                class_counts["flaky"] += 1
+            if result.outcome == "Passed":
+                class_counts["passed"] += 1
+            elif result.outcome == "Failed":
+                class_counts["failed"] += 1
+            elif result.outcome in ("Skipped", "NotExecuted"):
+                class_counts["skipped"] += 1
+        return counts
+
+    def mark_recovered(self, test_names):
+        """Count failed tests that passed on a rerun as passed, flagged as flaky"""
+        for result in self.results:
+            if result.outcome == "Failed" and result.test_name in test_names:
+                result.outcome = "Passed"
+                result.flaky = True
+    
+    def total_duration(self):
+        """Sum of all test durations in seconds"""
+        return sum(result.duration for result in self.results)
+    
+    def slowest(self, n):
+        """The n slowest test results, slowest first"""
+        return heapq.nlargest(n, self.results, key=lambda result: result.duration)
+    
+    def durations_by(self, key):
+        """Aggregate {group: [test count, total seconds]} for key(result)"""
+        groups = defaultdict(lambda: [0, 0.0])
+        for result in self.results:
+            group = groups[key(result)]
+            group[0] += 1
+            group[1] += result.duration
+        return groups
+    
+    def to_columns(self):
+        """Columnar form for JSON caches (the source is stored by the caller)"""
+        return {
+            "test_name": [r.test_name for r in self.results],
+            "outcome": [r.outcome for r in self.results],
+            "duration": [r.duration for r in self.results],
+            "start_time": [r.start_time for r in self.results],
+        }
+    
+    @classmethod
+    def from_columns(cls, columns, source=""):
+        """Rebuild a store from to_columns() output"""
+        store = cls()
+        for test_name, outcome, duration, start_time in zip(
+            columns["test_name"], columns["outcome"], columns["duration"], columns["start_time"]
+        ):
+            store.add(test_name, outcome, duration, start_time, source)
+        return store
@@ -0,0 +1,226 @@
+"""
+Append-only history of test statistics across runs.
+
+Every run of run_tests_and_update_excel.py adds one row per component to a
+SQLite database next to the solution, tagged with the run timestamp and the
+git commit. Per-run totals are stored on the run row itself, so the trend
+queries only touch the runs table and stay fast with thousands of runs.
+The outcome of every test is kept too (names stored once in `tests`), which
+is what the flaky test detection looks back on.
+"""
+import sqlite3
+import argparse
+import subprocess
+from pathlib import Path
+from datetime import datetime
+
+BASE_PATH = Path(__file__).parent
+HISTORY_DB = BASE_PATH / "Unit_Test_History.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    commit_sha TEXT,
+    components INTEGER NOT NULL,
+    tests INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS component_results (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    component TEXT NOT NULL,
+    type TEXT,
+    module TEXT,
+    status TEXT,
+    tests INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    project TEXT NOT NULL,
+    UNIQUE (name, project)
+);
+CREATE TABLE IF NOT EXISTS test_outcomes (
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    outcome TEXT NOT NULL,
+    reruns INTEGER NOT NULL DEFAULT 0,
+    recovered INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (test_id, run_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS runs_timestamp ON runs(timestamp);
+CREATE INDEX IF NOT EXISTS runs_commit ON runs(commit_sha);
+CREATE INDEX IF NOT EXISTS component_results_run ON component_results(run_id);
+CREATE INDEX IF NOT EXISTS component_results_component ON component_results(component, run_id);
+CREATE INDEX IF NOT EXISTS test_outcomes_run ON test_outcomes(run_id, outcome);
+"""
+
+def connect(db_file=HISTORY_DB):
+    """Open the history database, creating the tables on first use"""
+    conn = sqlite3.connect(db_file)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    return conn
+
+def current_commit():
+    """Commit hash of the working tree, or None outside a git checkout"""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=BASE_PATH
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() if result.returncode == 0 else None
+
+def record_run(conn, components, row_results, commit=None, timestamp=None, test_outcomes=None):
+    """Append one run: a row per component, the run totals and optionally every test's outcome"""
+    timestamp = timestamp or datetime.now().isoformat(timespec="seconds")
+    records = []
+    for component, counts in zip(components, row_results):
+        counts = counts or {}
+        records.append((
+            component.name,
+            component.type,
+            component.module,
+            component.status,
+            component.test_count,
+            counts.get("passed", 0),
+            counts.get("failed", 0),
+            counts.get("skipped", 0)
+        ))
+    
+    with conn:
+        cursor = conn.execute(
+            "INSERT INTO runs (timestamp, commit_sha, components, tests, passed, failed, skipped)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (
+                timestamp,
+                commit,
+                len(records),
+                sum(r[4] for r in records),
+                sum(r[5] for r in records),
+                sum(r[6] for r in records),
+                sum(r[7] for r in records)
+            )
+        )
+        run_id = cursor.lastrowid
+        conn.executemany(
+            "INSERT INTO component_results"
+            " (run_id, component, type, module, status, tests, passed, failed, skipped)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(run_id,) + record for record in records]
+        )
+        if test_outcomes:
+            record_test_outcomes(conn, run_id, test_outcomes)
+    return run_id
+
+def record_test_outcomes(conn, run_id, test_outcomes):
+    """Store (test name, project, outcome, reruns, recovered) tuples for a run"""
+    conn.executemany(
+        "INSERT OR IGNORE INTO tests (name, project) VALUES (?, ?)",
+        {(name, project) for name, project, *_ in test_outcomes}
+    )
+    test_ids = {
+        (row["name"], row["project"]): row["id"]
+        for row in conn.execute("SELECT id, name, project FROM tests")
+    }
+    conn.executemany(
+        "INSERT OR REPLACE INTO test_outcomes (test_id, run_id, outcome, reruns, recovered) VALUES (?, ?, ?, ?, ?)",
+        [
+            (test_ids[(name, project)], run_id, outcome, reruns, int(recovered))
+            for name, project, outcome, reruns, recovered in test_outcomes
+        ]
+    )
+
+def failing_test_history(conn, window=20):
+    """Outcomes over the last `window` runs of every test that failed in them, oldest first"""
+    first_run = conn.execute(
+        "SELECT id FROM runs ORDER BY id DESC LIMIT 1 OFFSET ?", (window - 1,)
+    ).fetchone()
+    first_run_id = first_run["id"] if first_run else 0
+    rows = conn.execute(
+        "SELECT tests.name, tests.project, o.run_id, o.outcome, o.reruns, o.recovered"
+        " FROM test_outcomes AS o JOIN tests ON tests.id = o.test_id"
+        " WHERE o.run_id >= ? AND o.test_id IN"
+        " (SELECT test_id FROM test_outcomes WHERE run_id >= ? AND outcome = 'Failed')"
+        " ORDER BY tests.name, tests.project, o.run_id",
+        (first_run_id, first_run_id)
+    ).fetchall()
+    history = {}
+    for row in rows:
+        history.setdefault((row["name"], row["project"]), []).append(
+            (row["run_id"], row["outcome"], row["reruns"], bool(row["recovered"]))
+        )
+    return history
+
+def pass_rate(passed, tests):
+    """Passed tests as a fraction of all tests"""
+    return passed / tests if tests else 0.0
+
+def run_trends(conn, limit=50, since=None):
+    """Totals of the last `limit` runs (optionally since a timestamp), oldest first"""
+    query = "SELECT * FROM runs"
+    params = []
+    if since:
+        query += " WHERE timestamp >= ?"
+        params.append(since)
+    query += " ORDER BY id DESC LIMIT ?"
+    params.append(limit)
+    rows = conn.execute(query, params).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+def component_trend(conn, component, limit=50):
+    """Results of one component over the last `limit` runs it appeared in, oldest first"""
+    rows = conn.execute(
+        "SELECT runs.id AS run_id, runs.timestamp, runs.commit_sha, cr.status, cr.tests, cr.passed, cr.failed, cr.skipped"
+        " FROM component_results AS cr JOIN runs ON runs.id = cr.run_id"
+        " WHERE cr.component = ? ORDER BY cr.run_id DESC LIMIT ?",
+        (component, limit)
+    ).fetchall()
+    return [dict(row) for row in reversed(rows)]
+
+def runs_for_commit(conn, commit):
+    """Every run recorded for a commit (a prefix of the hash is enough)"""
+    rows = conn.execute(
+        "SELECT * FROM runs WHERE commit_sha GLOB ? ORDER BY id",
+        (commit + "*",)
+    ).fetchall()
+    return [dict(row) for row in rows]
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Show test statistics trends across runs")
+    parser.add_argument("--component", help="Show the history of one component")
+    parser.add_argument("--commit", help="Show the runs recorded for a commit")
+    parser.add_argument("--limit", type=int, default=20, help="Number of runs to show (default: 20)")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Print run or component trends"""
+    args = parse_args(argv)
+    if not HISTORY_DB.exists():
+        print(f"No test history yet: {HISTORY_DB}")
+        return
+    
+    conn = connect()
+    if args.component:
+        for row in component_trend(conn, args.component, args.limit):
+            print(f"{row['timestamp']}  {(row['commit_sha'] or '-')[:10]:<10}  {row['status']:<12}  "
+                  f"{row['passed']}/{row['tests']} passed")
+    else:
+        runs = runs_for_commit(conn, args.commit) if args.commit else run_trends(conn, args.limit)
+        for row in runs:
+            print(f"{row['timestamp']}  {(row['commit_sha'] or '-')[:10]:<10}  {row['tests']} tests, "
+                  f"{row['failed']} failed, pass rate {pass_rate(row['passed'], row['tests']):.1%}")
+    conn.close()
+
+if __name__ == "__main__":
+    main()
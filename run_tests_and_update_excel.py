@@ -1,69 +1,358 @@
 """
 Script to run tests, parse results, and update Excel with actual test counts and status
 """
-import subprocess
 import re
-import csv
-import json
+import os
+import time
+import argparse
+import shutil
+import importlib
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import xml.etree.ElementTree as ET
 
+from result_store import TestResultStore, parse_duration
+from cache_io import load_json_cache, save_json_cache
+from file_hashing import file_sha256
+from csharp_signatures import NAMESPACE_RE, blank_literals
+from project_graph import load_projects, affected_test_projects, changed_files_since
+from source_watcher import watch_changes
+from dotnet_runner import run_projects
+from build_stage import build_outdated
+from coverage_report import load_coverage, coverage_by_row
+from statistics_model import TestStatistics, CsvSink, write_statistics, write_performance_csv, PERFORMANCE_CSV
+from result_cache import ResultCache
+from flaky_tests import STABILITY_WINDOW, rerun_filter, stability_rows, read_flaky_csv, write_flaky_csv
+import run_history
+import profiling
+
 BASE_PATH = Path(__file__).parent
+TRX_CACHE_FILE = BASE_PATH / ".trx_cache.json"
+TRX_CACHE_VERSION = 2
+SHARD_RESULTS_DIR = BASE_PATH / "ShardResults"
+RERUN_RESULTS_DIR = BASE_PATH / "RerunResults"
+# Name of the TRX file every project wrote when the whole solution ran in one
+# dotnet test; the results are now in <Project>.trx
+LEGACY_TRX_NAME = "test-results.trx"
+# Seconds before a hung test project is killed
+DEFAULT_TIMEOUT = 900
+CLASS_RE = re.compile(r'\bclass\s+(\w+)')
 
-def run_tests():
-    """Run all tests and capture output"""
-    print("Running tests...")
-    try:
-        result = subprocess.run(
-            ["dotnet", "test", "--logger", "trx;LogFileName=test-results.trx", "--no-build"],
-            capture_output=True,
-            text=True,
-            cwd=BASE_PATH
+def discover_test_projects():
+    """Find all *.Tests.csproj test projects next to the solution"""
+    return sorted(BASE_PATH.glob("*/*.Tests.csproj"))
+
+def run_tests(jobs=None, projects=None, build=False, filters=None, results_root=None,
+              timeout=DEFAULT_TIMEOUT, stream_output=False, collect_coverage=False, on_finished=None):
+    """Run test projects (all by default) in parallel, showing their progress live"""
+    if projects is None:
+        projects = discover_test_projects()
+    if not projects:
+        print("No *.Tests.csproj projects found.")
+        return []
+    
+    # Each project is one dotnet process whose output is read as it comes,
+    # so a single event loop drives them all
+    jobs = jobs or min(len(projects), os.cpu_count() or 1)
+    print(f"Running {len(projects)} test projects with {jobs} parallel jobs...")
+    with profiling.span("run tests", projects=len(projects), jobs=jobs):
+        results = asyncio.run(run_projects(
+            projects, BASE_PATH, jobs, build, filters, results_root, timeout, stream_output, collect_coverage,
+            on_finished
+        ))
+    return sorted(results, key=lambda r: r["project"])
+
+def build_stage(projects, args):
+    """Build outdated projects (per --build); returns the test projects that can run"""
+    if args.build == "never" or not projects:
+        return projects, None
+    
+    with profiling.span("build"):
+        summary = build_outdated(
+            projects, load_projects(), BASE_PATH,
+            jobs=args.jobs, timeout=args.timeout, force=args.build == "always"
         )
-        return result.stdout, result.stderr
-    except Exception as e:
-        print(f"Error running tests: {e}")
-        return "", str(e)
+    # Testing a project whose build failed would only run stale binaries
+    runnable = [csproj for csproj in projects if csproj.stem not in summary["failed"]]
+    for csproj in projects:
+        if csproj.stem in summary["failed"]:
+            print(f"Not testing {csproj.stem}: its build failed (its older results are left out)")
+    return runnable, summary
+
+def print_stage_times(build_summary, test_time):
+    """Report build and test time separately"""
+    if build_summary is None:
+        print(f"\nTest time: {test_time:.1f}s (build skipped)")
+        return
+    print(
+        f"\nBuild time: {build_summary['duration']:.1f}s "
+        f"({len(build_summary['built'])} built, {len(build_summary['failed'])} failed, "
+        f"{build_summary['up_to_date']} up to date), test time: {test_time:.1f}s"
+    )
+
+def print_run_problems(run_results):
+    """Show the end of the output of projects that failed or timed out"""
+    for result in run_results:
+        if result["returncode"] != 0:
+            output = result["stderr"] or result["stdout"]
+            print(f"Test execution warnings/errors in {result['project']}: {output[-500:]}")
+
+TRX_NAMESPACE = "{http://microsoft.com/schemas/VisualStudio/TeamTest/2010}"
+UNIT_TEST_RESULT_TAG = f"{TRX_NAMESPACE}UnitTestResult"
+
+def iter_trx_results(trx_file):
+    """Stream UnitTestResult attributes from a TRX file without building the DOM"""
+    # Elements are detached from their parent as soon as they end, so <Output>,
+    # StdOut and stack trace blobs never pile up in memory
+    parents = []
+    for event, elem in ET.iterparse(trx_file, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        
+        parents.pop()
+        if elem.tag == UNIT_TEST_RESULT_TAG:
+            yield (
+                elem.get('testName', ''),
+                elem.get('outcome', ''),
+                parse_duration(elem.get('duration')),
+                elem.get('startTime', '')
+            )
+        
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
+
+def trx_source_name(trx_file):
+    """Path of a TRX file relative to the solution, used as the result source"""
+    trx_file = Path(trx_file)
+    return str(trx_file.relative_to(BASE_PATH)) if trx_file.is_relative_to(BASE_PATH) else str(trx_file)
+
+def parse_trx_file(trx_file):
+    """Parse a single TRX file into a per-test result store"""
+    store = TestResultStore()
+    source = trx_source_name(trx_file)
+    for test_name, outcome, duration, start_time in iter_trx_results(trx_file):
+        store.add(test_name, outcome, duration, start_time, source)
+    return store
 
-def parse_trx_files():
-    """Parse TRX files to get test results per test class"""
-    test_results = defaultdict(lambda: {"total": 0, "passed": 0, "failed": 0, "skipped": 0})
+def load_trx_cache():
+    """Load the TRX ingestion index, or an empty one if missing or outdated"""
+    cache = load_json_cache(TRX_CACHE_FILE, TRX_CACHE_VERSION, "TRX cache")
+    return cache.get("files", {}) if cache else {}
+
+def save_trx_cache(entries):
+    """Write the TRX ingestion index next to the solution"""
+    save_json_cache(TRX_CACHE_FILE, TRX_CACHE_VERSION, files=entries)
+
+def find_trx_files(latest_only=False):
+    """Find TRX files, optionally keeping only the newest one per test project"""
+    # Shard runs are only counted when shard_runner.py merges them, and
+    # reruns of failed tests only through --rerun-failures. A leftover
+    # test-results.trx would count every test of its project twice.
+    trx_files = [
+        trx_file for trx_file in BASE_PATH.rglob("**/TestResults/*.trx")
+        if trx_file.name != LEGACY_TRX_NAME
+        and SHARD_RESULTS_DIR not in trx_file.parents and RERUN_RESULTS_DIR not in trx_file.parents
+    ]
+    if not latest_only:
+        return trx_files
     
-    # Find all TRX files
-    trx_files = list(BASE_PATH.rglob("**/TestResults/*.trx"))
+    # TRX files live in <Project>/TestResults, so group by the project folder
+    latest = {}
+    for trx_file in trx_files:
+        project_dir = trx_file.parent.parent
+        mtime = trx_file.stat().st_mtime_ns
+        if project_dir not in latest or mtime > latest[project_dir][0]:
+            latest[project_dir] = (mtime, trx_file)
+    return [trx_file for _, trx_file in latest.values()]
+
+def load_cached_trx_results(trx_file, cache_entries):
+    """Return (file_results, cache_entry, parsed) for a TRX file, parsing it only if it changed"""
+    key = trx_source_name(trx_file)
+    stat = trx_file.stat()
+    entry = cache_entries.get(key)
+    
+    # Same size and mtime: trust the stored results without reading the file
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return TestResultStore.from_columns(entry["tests"], key), entry, False
+    
+    # Touched but identical content (e.g. copied or checked out again)
+    sha256 = file_sha256(trx_file)
+    if entry and entry["size"] == stat.st_size and entry["sha256"] == sha256:
+        entry = dict(entry, mtime_ns=stat.st_mtime_ns)
+        return TestResultStore.from_columns(entry["tests"], key), entry, False
     
+    file_results = parse_trx_file(trx_file)
+    entry = {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": sha256,
+        "tests": file_results.to_columns()
+    }
+    return file_results, entry, True
+
+class ResultCollector:
+    """Parses TRX files on a worker thread as test projects finish, then merges them"""
+
+    def __init__(self, executor, use_cache=True, latest_only=False):
+        self.executor = executor
+        self.use_cache = use_cache
+        self.latest_only = latest_only
+        self.cache_entries = load_trx_cache() if use_cache else {}
+        # TRX file -> (mtime when queued, future of load())
+        self.queued = {}
+        # Projects whose TRX files on disk are left out of the results
+        self.skipped = set()
+
+    def load(self, trx_file):
+        """Parse one TRX file (on the worker); returns (file_results, cache_entry, parsed)"""
+        with profiling.span("load TRX", file=trx_source_name(trx_file)):
+            if self.use_cache:
+                return load_cached_trx_results(trx_file, self.cache_entries)
+            return parse_trx_file(trx_file), None, True
+
+    def submit(self, trx_file):
+        """Queue a TRX file for parsing"""
+        trx_file = Path(trx_file)
+        if trx_file.exists():
+            self.queued[trx_file] = (trx_file.stat().st_mtime_ns, self.executor.submit(self.load, trx_file))
+
+    def submit_existing(self, skip_projects=()):
+        """Queue the TRX files already on disk, except those of the projects about to run"""
+        for trx_file in find_trx_files(latest_only=self.latest_only):
+            if trx_file.relative_to(BASE_PATH).parts[0] not in skip_projects:
+                self.submit(trx_file)
+
+    def skip(self, project_names):
+        """Leave the TRX files of these projects out of the results"""
+        self.skipped.update(project_names)
+
+    def collect(self):
+        """Wait for the queued files, parse any other TRX file on disk and merge them all"""
+        trx_files = [
+            trx_file for trx_file in find_trx_files(latest_only=self.latest_only)
+            if trx_file.relative_to(BASE_PATH).parts[0] not in self.skipped
+        ]
+        for trx_file in trx_files:
+            queued = self.queued.get(trx_file)
+            if queued is None or queued[0] != trx_file.stat().st_mtime_ns:
+                self.submit(trx_file)
+        
+        test_results = TestResultStore()
+        new_entries = {}
+        parsed = 0
+        for trx_file in trx_files:
+            try:
+                file_results, entry, was_parsed = self.queued[trx_file][1].result()
+            except Exception as e:
+                print(f"Error parsing {trx_file}: {e}")
+                continue
+            if self.use_cache:
+                new_entries[trx_source_name(trx_file)] = entry
+            parsed += was_parsed
+            # Each file is parsed whole before merging, so a truncated TRX adds nothing
+            test_results.extend(file_results)
+        
+        if self.use_cache:
+            # Keep entries skipped by --latest-only, drop those whose file is gone
+            for key, entry in self.cache_entries.items():
+                if key not in new_entries and (BASE_PATH / key).exists():
+                    new_entries[key] = entry
+            # The report does not need the index, so it is written in the background
+            self.executor.submit(save_trx_cache, new_entries)
+            print(f"Parsed {parsed} of {len(trx_files)} TRX files ({len(trx_files) - parsed} from cache)")
+        
+        return test_results
+
+def parse_trx_files(use_cache=True, latest_only=False):
+    """Parse TRX files into a per-test result store"""
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return ResultCollector(executor, use_cache, latest_only).collect()
+
+def parse_trx_tree(results_dirs):
+    """Parse every <Project>/TestResults/*.trx under the given directories into one store"""
+    test_results = TestResultStore()
+    trx_files = sorted(
+        trx_file for results_dir in results_dirs
+        for trx_file in Path(results_dir).rglob("*/TestResults/*.trx")
+    )
     for trx_file in trx_files:
         try:
-            tree = ET.parse(trx_file)
-            root = tree.getroot()
-            
-            # Namespace handling
-            namespaces = {'ns': 'http://microsoft.com/schemas/VisualStudio/TeamTest/2010'}
-            
-            # Get all test results
-            for unit_test_result in root.findall('.//ns:UnitTestResult', namespaces):
-                test_name = unit_test_result.get('testName', '')
-                outcome = unit_test_result.get('outcome', '')
-                
-                # Extract test class from test name (format: ClassName.MethodName)
-                if '.' in test_name:
-                    class_name = test_name.rsplit('.', 1)[0]
-                    class_name = class_name.split('+')[0]  # Handle nested classes
-                    
-                    test_results[class_name]["total"] += 1
-                    if outcome == "Passed":
-                        test_results[class_name]["passed"] += 1
-                    elif outcome == "Failed":
-                        test_results[class_name]["failed"] += 1
-                    elif outcome == "Skipped":
-                        test_results[class_name]["skipped"] += 1
+            test_results.extend(parse_trx_file(trx_file))
         except Exception as e:
             print(f"Error parsing {trx_file}: {e}")
-            continue
+    return test_results, len(trx_files)
+
+def rerun_failures(test_results, run_results, reruns, jobs=None, timeout=DEFAULT_TIMEOUT):
+    """Rerun the tests that failed in this run up to `reruns` times; returns {test name: (reruns, recovered)}"""
+    fresh_sources = {trx_source_name(result["trx_file"]) for result in run_results}
+    failing = {
+        result.test_name: result.project
+        for result in test_results
+        if result.outcome == "Failed" and result.source in fresh_sources
+    }
+    attempts = {name: (0, False) for name in failing}
+    shutil.rmtree(RERUN_RESULTS_DIR, ignore_errors=True)
+    
+    for attempt in range(1, reruns + 1):
+        if not failing:
+            break
+        by_project = defaultdict(list)
+        for name, project in failing.items():
+            by_project[project].append(name)
+        filters = {
+            BASE_PATH / project / f"{project}.csproj": rerun_filter(names)
+            for project, names in by_project.items()
+        }
+        print(f"\nRerun {attempt}/{reruns}: {len(failing)} failed tests in {len(filters)} projects...")
+        # Every project reruns its own failures in parallel with the others
+        run_tests(
+            jobs=jobs, projects=sorted(filters), filters=filters,
+            results_root=RERUN_RESULTS_DIR / f"attempt-{attempt}", timeout=timeout
+        )
+        rerun_results, _ = parse_trx_tree([RERUN_RESULTS_DIR / f"attempt-{attempt}"])
+        passed = {result.test_name for result in rerun_results if result.outcome == "Passed"}
+        for name in list(failing):
+            attempts[name] = (attempt, name in passed)
+            if name in passed:
+                del failing[name]
     
-    return test_results
+    if attempts:
+        recovered = sum(was_recovered for _, was_recovered in attempts.values())
+        print(f"{recovered} of {len(attempts)} failed tests passed on a rerun")
+    return attempts
+
+def run_test_outcomes(test_results, run_results, reruns):
+    """(test name, project, outcome, reruns, recovered) of every test of this run"""
+    fresh_sources = {trx_source_name(result["trx_file"]) for result in run_results}
+    outcomes = {}
+    for result in test_results:
+        if result.source not in fresh_sources:
+            continue
+        # The first attempt's outcome; mark_recovered() has turned recovered failures into passes
+        outcome = "Failed" if result.flaky else result.outcome
+        rerun_count, recovered = reruns.get(result.test_name, (0, False))
+        outcomes[(result.test_name, result.project)] = (outcome, rerun_count, recovered)
+    return [(name, project) + outcome for (name, project), outcome in outcomes.items()]
+
+def update_flaky_report(conn, test_outcomes):
+    """Classify the tests that failed lately and write the Flaky report; returns its rows"""
+    if conn is not None:
+        history = run_history.failing_test_history(conn, STABILITY_WINDOW)
+    else:
+        # Without history only this run's failures can be classified
+        history = {
+            (name, project): [(None, outcome, rerun_count, recovered)]
+            for name, project, outcome, rerun_count, recovered in test_outcomes
+            if outcome == "Failed"
+        }
+    rows = stability_rows(history)
+    write_flaky_csv(rows)
+    return rows
 
 def extract_test_class_name(full_test_class_name):
     """Extract test class name from full namespace path"""
@@ -81,212 +370,476 @@ def map_test_class_to_component(test_class_name):
     # Test class names are typically: ComponentNameTests
     # Component names in CSV are: ComponentName
     class_name = extract_test_class_name(test_class_name)
-    component_name = class_name.replace("Tests", "")
-    return component_name
+    return class_name.removesuffix("Tests")
 
-def update_csv_with_results(test_results):
-    """Update CSV files with actual test results"""
-    detailed_csv = BASE_PATH / "Unit_Test_Statistics_Detailed.csv"
+def expected_test_file(component):
+    """Path (relative to BASE_PATH) where the test file of a component lives"""
+    test_file = component.test_file
+    module = component.module
+    comp_type = component.type
     
-    if not detailed_csv.exists():
-        print(f"CSV file not found: {detailed_csv}")
-        return
+    if comp_type == "Service" or comp_type == "SagaService":
+        if "Saga" in component.namespace:
+            return Path(f"{module}.Application.Tests", "Services", "Saga", test_file)
+        return Path(f"{module}.Application.Tests", "Services", test_file)
+    elif comp_type == "Controller":
+        if module == "Gateway":
+            return Path("API.Gateway.Tests", "Controllers", test_file)
+        elif module == "Lawyers":
+            return Path("Lawyers.Services.API.Tests", "Controllers", test_file)
+        return Path(f"{module}.Services.API.Tests", "Controllers", test_file)
+    elif comp_type == "Repository":
+        return Path(f"{module}.Infrastructure.Tests", "Repository", test_file)
+    return None
+
+def scan_test_files():
+    """List the .cs files of every test project in one walk"""
+    test_files = set()
+    pending = [path for path in BASE_PATH.glob("*.Tests") if path.is_dir()]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in ("bin", "obj", "TestResults"):
+                        pending.append(entry.path)
+                elif entry.name.endswith(".cs"):
+                    test_files.add(Path(entry.path).relative_to(BASE_PATH))
+    return test_files
+
+def declared_test_classes(test_file):
+    """Fully qualified names of the classes declared in a C# file"""
+    code = blank_literals(test_file.read_text(encoding='utf-8-sig', errors='replace'))
+    namespace_match = NAMESPACE_RE.search(code)
+    prefix = namespace_match.group(1) + "." if namespace_match else ""
+    return [prefix + name for name in CLASS_RE.findall(code)]
+
+def build_test_class_index(components, test_files):
+    """Map fully qualified test class names to the index of their component"""
+    index = {}
+    for row_idx, component in enumerate(components):
+        test_file = expected_test_file(component)
+        if test_file not in test_files:
+            continue
+        test_class_name = Path(component.test_file).stem
+        for full_name in declared_test_classes(BASE_PATH / test_file):
+            if extract_test_class_name(full_name) == test_class_name:
+                index[full_name] = row_idx
+    return index
+
+def match_results_to_rows(components, test_results, index):
+    """Sum the per-class counters of each component (None for components without results)"""
+    # Classes outside the expected test files fall back to their short name,
+    # as long as exactly one component has a test file of that name
+    rows_by_test_class = defaultdict(list)
+    for row_idx, component in enumerate(components):
+        rows_by_test_class[Path(component.test_file).stem].append(row_idx)
     
-    # Read current CSV
-    rows = []
-    with open(detailed_csv, 'r', encoding='utf-8-sig') as f:
-        reader = csv.DictReader(f)
-        fieldnames = reader.fieldnames
-        for row in reader:
-            rows.append(row)
+    row_results = [None] * len(components)
+    for test_class, results in test_results.class_counts().items():
+        row_idx = index.get(test_class)
+        if row_idx is None:
+            candidates = rows_by_test_class.get(extract_test_class_name(test_class), [])
+            if len(candidates) != 1:
+                if candidates:
+                    print(f"Ambiguous test class {test_class}: matches {len(candidates)} components")
+                continue
+            row_idx = candidates[0]
+        
+        if row_results[row_idx] is None:
+            row_results[row_idx] = dict(results)
+        else:
+            for key, value in results.items():
+                row_results[row_idx][key] += value
+    return row_results
+
+def load_detailed_rows():
+    """Read the statistics and index their test classes; None if the CSV files are missing"""
+    with profiling.span("read statistics CSV"):
+        statistics = TestStatistics.from_csv()
+    if statistics is None:
+        return None
     
-    # Create a mapping from component name to test results
-    component_to_results = {}
-    for test_class, results in test_results.items():
-        component_name = map_test_class_to_component(test_class)
-        component_to_results[component_name] = results
+    # Index the test classes once; every component is then a dict lookup and
+    # the test files are checked against a single listing instead of exists()
+    test_files = scan_test_files()
+    return {
+        "statistics": statistics,
+        "test_files": test_files,
+        "index": build_test_class_index(statistics.components, test_files)
+    }
+
+def update_csv_with_results(test_results, coverage=None, cached_sources=None, detailed=None, sinks=None):
+    """Update the statistics with a TestResultStore (and coverage, if collected) and write them to the sinks"""
+    # The statistics may have been read and indexed while the tests ran
+    detailed = detailed or load_detailed_rows()
+    if detailed is None:
+        print(f"CSV files not found: {BASE_PATH / 'Unit_Test_Statistics_Detailed.csv'}")
+        return None, None
+    components = detailed["statistics"].components
+    test_files, index = detailed["test_files"], detailed["index"]
+    with profiling.span("match results"):
+        row_results = match_results_to_rows(components, test_results, index)
     
-    # Update rows with test results
-    updated_rows = []
-    for row in rows:
-        component_name = row["Component Name"]
-        test_file = row["Test File"]
-        test_class_name = test_file.replace(".cs", "")
-        
-        # Try to find matching test class by component name
-        matched = False
-        matched_results = None
-        
-        if component_name in component_to_results:
-            matched = True
-            matched_results = component_to_results[component_name]
-        
-        if matched:
+    # Components whose every result comes from a TRX file reused from the result cache
+    cached_totals = [None] * len(components)
+    if cached_sources:
+        cached_results = TestResultStore()
+        cached_results.results = [result for result in test_results if result.source in cached_sources]
+        cached_totals = [
+            counts["total"] if counts else None
+            for counts in match_results_to_rows(components, cached_results, index)
+        ]
+    
+    # Update components with test results
+    for component, matched_results, cached_total in zip(components, row_results, cached_totals):
+        if matched_results is not None:
             total = matched_results["total"]
             passed = matched_results["passed"]
             failed = matched_results["failed"]
+            flaky = matched_results["flaky"]
             
             # Determine status
             if total == 0:
                 status = "Pending"
             elif failed > 0:
                 status = f"Failed ({failed})"
+            elif flaky > 0:
+                # Everything passed, but only after rerunning some failures
+                status = f"Flaky ({flaky})"
             elif passed == total:
                 status = "Passed"
             else:
                 status = "Partial"
+            if total > 0 and cached_total == total:
+                status += " (cached)"
             
-            row["Status"] = status
-            row["Test Count"] = str(total)
+            component.status = status
+            component.test_count = total
+        elif expected_test_file(component) in test_files:
+            # File exists but no tests found - might be empty or not run
+            component.status = "Pending"
+            component.test_count = 0
         else:
-            # If no tests found, check if test file exists
-            test_file_path = None
-            module = row["Module"]
-            comp_type = row["Type"]
-            
-            # Build test file path
-            if comp_type == "Service" or comp_type == "SagaService":
-                if "Saga" in row["Namespace"]:
-                    test_file_path = BASE_PATH / f"{module}.Application.Tests" / "Services" / "Saga" / test_file
-                else:
-                    test_file_path = BASE_PATH / f"{module}.Application.Tests" / "Services" / test_file
-            elif comp_type == "Controller":
-                if module == "Gateway":
-                    test_file_path = BASE_PATH / "API.Gateway.Tests" / "Controllers" / test_file
-                elif module == "Lawyers":
-                    test_file_path = BASE_PATH / "Lawyers.Services.API.Tests" / "Controllers" / test_file
-                else:
-                    test_file_path = BASE_PATH / f"{module}.Services.API.Tests" / "Controllers" / test_file
-            elif comp_type == "Repository":
-                test_file_path = BASE_PATH / f"{module}.Infrastructure.Tests" / "Repository" / test_file
-            
-            if test_file_path and test_file_path.exists():
-                # File exists but no tests found - might be empty or not run
-                row["Status"] = "Pending"
-                row["Test Count"] = "0"
-            else:
-                # File doesn't exist
-                row["Status"] = "Not Created"
-                row["Test Count"] = "0"
-        
-        updated_rows.append(row)
+            # File doesn't exist
+            component.status = "Not Created"
+            component.test_count = 0
     
-    # Write updated CSV
-    with open(detailed_csv, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(updated_rows)
+    # Without a new report the coverage of the last run that collected it stays
+    if coverage is not None:
+        for component, totals in zip(components, coverage_by_row(components, coverage)):
+            component.coverage = totals
     
-    print(f"\nUpdated {detailed_csv} with test results")
-    
-    # Update summary CSV
-    update_summary_csv(updated_rows)
+    # The summary is derived from the updated components
+    statistics = TestStatistics(components)
+    print("\nUpdated statistics with test results")
+    write_statistics(statistics, sinks if sinks is not None else [CsvSink()])
+    return statistics, row_results
+
+def percent_of(part, total):
+    """Format part as a percentage of total"""
+    return f"{(part / total * 100):.1f}%" if total > 0 else "0%"
 
-def update_summary_csv(detailed_rows):
-    """Update summary CSV based on detailed rows"""
-    summary_csv = BASE_PATH / "Unit_Test_Statistics_Summary.csv"
+def update_performance_report(test_results, top_n=20):
+    """Report the slowest tests and time spent per project and component; returns the rows"""
+    total = test_results.total_duration()
+    rows = [
+        ["Slowest Test", result.test_name, result.project, 1, round(result.duration, 3), percent_of(result.duration, total)]
+        for result in test_results.slowest(top_n)
+    ]
     
-    # Count by category
-    counts = {
-        "Services": {"count": 0, "tests": 0, "passed": 0},
-        "Controllers": {"count": 0, "tests": 0, "passed": 0},
-        "Repositories": {"count": 0, "tests": 0, "passed": 0}
-    }
+    by_project = test_results.durations_by(lambda r: r.project)
+    for project, (count, duration) in sorted(by_project.items(), key=lambda item: -item[1][1]):
+        rows.append(["Project", project, project, count, round(duration, 3), percent_of(duration, total)])
     
-    for row in detailed_rows:
-        comp_type = row["Type"]
-        if comp_type in ["Service", "SagaService"]:
-            category = "Services"
-        elif comp_type == "Controller":
-            category = "Controllers"
-        elif comp_type == "Repository":
-            category = "Repositories"
-        else:
-            continue
-        
-        counts[category]["count"] += 1
-        test_count = int(row.get("Test Count", 0))
-        counts[category]["tests"] += test_count
-        
-        # Check if passed
-        status = row.get("Status", "Pending")
-        if "Passed" in status or status == "Passed":
-            counts[category]["passed"] += 1
+    by_component = test_results.durations_by(
+        lambda r: (map_test_class_to_component(r.class_name), r.project)
+    )
+    for (component, project), (count, duration) in sorted(by_component.items(), key=lambda item: -item[1][1]):
+        rows.append(["Component", component, project, count, round(duration, 3), percent_of(duration, total)])
     
-    # Calculate totals
-    total_count = sum(c["count"] for c in counts.values())
-    total_tests = sum(c["tests"] for c in counts.values())
-    total_passed = sum(c["passed"] for c in counts.values())
-    
-    # Write summary CSV
-    with open(summary_csv, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.writer(f)
-        writer.writerow(["Category", "Count", "Tests Created", "Tests Passed", "Coverage %"])
-        
-        for category, data in counts.items():
-            coverage = f"{(data['tests'] / data['count'] * 100):.1f}%" if data['count'] > 0 else "0%"
-            writer.writerow([
-                category,
-                data["count"],
-                data["tests"],
-                data["passed"],
-                coverage
-            ])
-        
-        total_coverage = f"{(total_tests / total_count * 100):.1f}%" if total_count > 0 else "0%"
-        writer.writerow([
-            "TOTAL",
-            total_count,
-            total_tests,
-            total_passed,
-            total_coverage
-        ])
+    write_performance_csv(rows)
+    print(f"Updated {PERFORMANCE_CSV} (total test time {total:.1f}s)")
+    return rows
+
+def regenerate_excel(statistics=None):
+    """Rebuild the Excel workbook from the updated statistics (or the CSV files)"""
+    try:
+        from create_excel_statistics import ExcelSink
+        with profiling.span("excel workbook"):
+            excel_file = ExcelSink().write(statistics)
+        print(f"\nSuccess! Excel file updated: {excel_file}")
+    except Exception as e:
+        print(f"Error regenerating Excel: {e}")
+        print("You can manually run: python create_excel_statistics.py")
+
+def watch(args):
+    """Rerun the test projects affected by each batch of source changes"""
+    projects = load_projects()
+    # Every project folder of the solution, *.Domain included: a change
+    # anywhere reaches the test projects through the reference graph
+    roots = sorted({project["csproj"].parent for project in projects.values()})
+    print(f"Watching {len(roots)} project folders for changes (Ctrl+C to stop)...")
+    worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="statistics")
+    # Watching does not classify flaky tests, so the workbook keeps the last report
+    flaky_rows = read_flaky_csv()
     
-    print(f"Updated {summary_csv}")
+    try:
+        for changed_files in watch_changes(roots, args.interval):
+            start = time.perf_counter()
+            if any(path.suffix == ".csproj" for path in changed_files):
+                projects = load_projects()
+            
+            print(f"\n{len(changed_files)} file(s) changed:")
+            for path in sorted(changed_files)[:10]:
+                print(f"  - {path.relative_to(BASE_PATH) if path.is_relative_to(BASE_PATH) else path}")
+            
+            test_projects = affected_test_projects(changed_files, projects)
+            if not test_projects:
+                print("No test project depends on the changed files.")
+                continue
+            
+            # Only the newest TRX of each project counts; the other projects'
+            # results come straight from the ingestion cache, parsed meanwhile
+            collector = ResultCollector(worker, use_cache=not args.no_cache, latest_only=True)
+            collector.submit_existing(skip_projects={csproj.stem for csproj in test_projects})
+            detailed = worker.submit(load_detailed_rows)
+            
+            # Sources changed since the last build, so rebuild what is outdated first
+            test_projects, build_summary = build_stage(test_projects, args)
+            if build_summary:
+                collector.skip(build_summary["failed"])
+            test_start = time.perf_counter()
+            run_results = run_tests(
+                jobs=args.jobs, projects=test_projects,
+                timeout=args.timeout, stream_output=args.stream, collect_coverage=args.coverage,
+                on_finished=lambda result: collector.submit(result["trx_file"])
+            )
+            print_run_problems(run_results)
+            print_stage_times(build_summary, time.perf_counter() - test_start)
+            
+            test_results = collector.collect()
+            if test_results:
+                statistics, _ = update_csv_with_results(
+                    test_results, load_coverage() if args.coverage else None, detailed=detailed.result()
+                )
+                performance_rows = update_performance_report(test_results, top_n=args.top)
+                if statistics is not None:
+                    statistics.performance, statistics.flaky = performance_rows, flaky_rows
+                regenerate_excel(statistics)
+            print(f"\nUpdated in {time.perf_counter() - start:.1f}s, waiting for changes...")
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    finally:
+        worker.shutdown(cancel_futures=True)
 
-def main():
-    """Main function"""
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run tests and update Excel statistics")
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=None,
+        help="Number of test projects to run in parallel (default: CPU count)"
+    )
+    parser.add_argument(
+        "--build",
+        choices=["auto", "always", "never"],
+        default="auto",
+        help="Build outdated projects before testing (auto, default), every project (always) or none (never)"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Seconds before a test project is killed as hung (default: {DEFAULT_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Echo every line of dotnet test output, prefixed with the project name"
+    )
+    parser.add_argument(
+        "--coverage",
+        action="store_true",
+        help="Collect coverlet coverage and report line/branch coverage per component"
+    )
+    parser.add_argument(
+        "--rerun-failures",
+        type=int,
+        default=0,
+        metavar="K",
+        help="Rerun failed tests up to K times to tell flaky tests from broken ones (default: 0)"
+    )
+    parser.add_argument(
+        "--no-result-cache",
+        action="store_true",
+        help="Run every test project, even those whose sources and references are unchanged since they passed"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Re-parse every TRX file instead of using the ingestion cache"
+    )
+    parser.add_argument(
+        "--latest-only",
+        action="store_true",
+        help="Only count the newest TRX file of each test project"
+    )
+    parser.add_argument(
+        "--no-history",
+        action="store_true",
+        help="Do not append this run to the test history database"
+    )
+    parser.add_argument(
+        "--changed-since",
+        metavar="REF",
+        help="Only run the test projects impacted by changes since this git ref (e.g. origin/main)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Watch the source folders and rerun only the test projects affected by each change"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Seconds between checks for changes in watch mode (default: 1.0)"
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="Number of slowest tests listed in the performance report (default: 20)"
+    )
+    profiling.add_arguments(parser)
+    return parser.parse_args(argv)
+
+def run_and_update(args):
+    """Run the tests once and update the CSV files, the history and the workbook"""
     print("=" * 60)
     print("Running Tests and Updating Excel Statistics")
     print("=" * 60)
     
     # Step 1: Run tests
     print("\n[1/3] Running tests...")
-    stdout, stderr = run_tests()
+    projects = None
+    if args.changed_since:
+        changed_files = changed_files_since(args.changed_since)
+        projects = affected_test_projects(changed_files, load_projects())
+        print(f"{len(changed_files)} file(s) changed since {args.changed_since}, "
+              f"{len(projects)} test project(s) impacted")
+        if not projects:
+            print("No test project is impacted, nothing to run.")
+            return
+    projects = projects if projects is not None else discover_test_projects()
+    
+    # Projects that passed with the same inputs before keep their TRX files
+    with profiling.span("result cache lookup"):
+        result_cache = ResultCache(load_projects(), use_cache=not args.no_result_cache)
+        projects, cached_trx = result_cache.lookup(projects, collect_coverage=args.coverage)
+    for name in sorted(cached_trx):
+        print(f"  - {name}: unchanged, reusing {cached_trx[name].relative_to(BASE_PATH)}")
     
-    if stderr:
-        print(f"Test execution warnings/errors: {stderr[:500]}")
+    # While the tests run, a worker thread parses the TRX files of the other
+    # projects, reads and indexes the detailed CSV, loads the workbook code and
+    # parses each project's TRX file as soon as the project finishes
+    worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="statistics")
+    collector = ResultCollector(worker, use_cache=not args.no_cache, latest_only=args.latest_only)
+    collector.submit_existing(skip_projects={csproj.stem for csproj in projects})
+    detailed = worker.submit(load_detailed_rows)
+    worker.submit(importlib.import_module, "create_excel_statistics")
+    projects, build_summary = build_stage(projects, args)
+    if build_summary:
+        # Their TRX files on disk come from an older build
+        collector.skip(build_summary["failed"])
+    
+    test_start = time.perf_counter()
+    run_results = []
+    if projects:
+        run_results = run_tests(
+            jobs=args.jobs, projects=projects, timeout=args.timeout, stream_output=args.stream,
+            collect_coverage=args.coverage, on_finished=lambda result: collector.submit(result["trx_file"])
+        )
+    elif cached_trx:
+        print(f"All {len(cached_trx)} test projects are unchanged, nothing to run.")
+    test_time = time.perf_counter() - test_start
+    result_cache.record(run_results, collect_coverage=args.coverage)
+    result_cache.save()
+    print_run_problems(run_results)
+    print_stage_times(build_summary, test_time)
     
     # Step 2: Parse test results
     print("\n[2/3] Parsing test results...")
-    test_results = parse_trx_files()
+    collect_start = time.perf_counter()
+    with profiling.span("collect results"):
+        test_results = collector.collect()
+    print(f"Results ready {time.perf_counter() - collect_start:.2f}s after the last test project finished")
     
     if not test_results:
         print("No test results found. Make sure tests were executed successfully.")
         return
     
-    print(f"Found test results for {len(test_results)} test classes:")
-    for test_class, results in sorted(test_results.items()):
+    class_results = test_results.class_counts()
+    print(f"Found {len(test_results)} test results in {len(class_results)} test classes:")
+    for test_class, results in sorted(class_results.items()):
         print(f"  - {test_class}: {results['total']} tests ({results['passed']} passed, {results['failed']} failed)")
     
+    reruns = {}
+    if args.rerun_failures > 0:
+        with profiling.span("rerun failures"):
+            reruns = rerun_failures(test_results, run_results, args.rerun_failures, jobs=args.jobs, timeout=args.timeout)
+        test_results.mark_recovered({name for name, (_, recovered) in reruns.items() if recovered})
+    test_outcomes = run_test_outcomes(test_results, run_results, reruns)
+    
     # Step 3: Update CSV files
     print("\n[3/3] Updating CSV files with test results...")
-    update_csv_with_results(test_results)
+    coverage = None
+    if args.coverage:
+        with profiling.span("load coverage"):
+            coverage = load_coverage()
+    with profiling.span("update statistics"):
+        statistics, row_results = update_csv_with_results(
+            test_results, coverage,
+            cached_sources={trx_source_name(trx_file) for trx_file in cached_trx.values()},
+            detailed=detailed.result()
+        )
+    worker.shutdown()
+    with profiling.span("performance report"):
+        performance_rows = update_performance_report(test_results, top_n=args.top)
+    
+    with profiling.span("history"):
+        conn = None
+        if statistics and not args.no_history:
+            conn = run_history.connect()
+            run_id = run_history.record_run(
+                conn, statistics.components, row_results, commit=run_history.current_commit(), test_outcomes=test_outcomes
+            )
+            print(f"Recorded run {run_id} in {run_history.HISTORY_DB}")
+        flaky_rows = update_flaky_report(conn, test_outcomes)
+        if conn is not None:
+            conn.close()
+    if statistics is not None:
+        # The workbook shows the reports from memory; their CSV files are only output
+        statistics.performance, statistics.flaky = performance_rows, flaky_rows
     
     # Step 4: Regenerate Excel
     print("\n[4/4] Regenerating Excel file...")
-    try:
-        from create_excel_statistics import create_excel_statistics
-        excel_file = create_excel_statistics()
-        print(f"\nSuccess! Excel file updated: {excel_file}")
-    except Exception as e:
-        print(f"Error regenerating Excel: {e}")
-        print("You can manually run: python create_excel_statistics.py")
+    regenerate_excel(statistics)
     
     print("\n" + "=" * 60)
     print("Completed!")
     print("=" * 60)
 
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    with profiling.session(args, "run_tests_and_update_excel"):
+        if args.watch:
+            watch(args)
+            return
+        return run_and_update(args)
+
 if __name__ == "__main__":
     main()
 
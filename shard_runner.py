@@ -0,0 +1,231 @@
+"""
+Split the test classes into balanced shards and merge the shard results.
+
+  python shard_runner.py plan --shards 4          # write shard_plan.json
+  python shard_runner.py run --index 0            # on CI node 0
+  python shard_runner.py merge                    # combine ShardResults/*
+  python shard_runner.py local --shards 4         # all of the above locally
+
+Shards are balanced with the class durations of the last recorded TRX
+files; each shard runs `dotnet test --filter` per test project and writes
+its TRX files to ShardResults/shard-<index>/<Project>/TestResults. The
+least loaded shard also runs every test the plan does not assign (classes
+added since, or not named *Tests), so no test is dropped.
+"""
+import sys
+import json
+import heapq
+import shutil
+import argparse
+import subprocess
+from pathlib import Path
+from collections import defaultdict
+
+from build_stage import build_outdated
+from flaky_tests import read_flaky_csv
+from project_graph import load_projects
+from run_tests_and_update_excel import (
+    BASE_PATH, SHARD_RESULTS_DIR, discover_test_projects, parse_trx_files, parse_trx_tree, scan_test_files,
+    declared_test_classes, run_tests, update_csv_with_results, update_performance_report, regenerate_excel
+)
+
+SHARD_PLAN_FILE = BASE_PATH / "shard_plan.json"
+SHARD_PLAN_VERSION = 2
+# Each test host start costs a few seconds on top of the tests themselves
+PROJECT_OVERHEAD = 2.0
+
+def class_durations():
+    """Seconds spent per (test project, test class) in the latest TRX files"""
+    durations = defaultdict(float)
+    for result in parse_trx_files(latest_only=True):
+        durations[(result.project, result.class_name)] += result.duration
+    return durations
+
+def known_test_classes():
+    """(test project, test class) pairs declared in the test projects' sources"""
+    classes = set()
+    for test_file in scan_test_files():
+        for full_name in declared_test_classes(BASE_PATH / test_file):
+            if full_name.endswith("Tests"):
+                classes.add((test_file.parts[0], full_name))
+    return classes
+
+# Test names continue a class name with "." (methods) or "+" (nested classes);
+# the separator keeps FooTests from also matching FooTestsExtra
+NAME_SEPARATORS = (".", "+")
+
+def class_filter(class_names):
+    """dotnet test --filter expression selecting whole test classes"""
+    return "|".join(f"FullyQualifiedName~{name}{sep}" for name in sorted(class_names) for sep in NAME_SEPARATORS)
+
+def remainder_filter(plan, index, project):
+    """Filter running every test of a project that no other shard runs (None: the whole project)"""
+    others = sorted(
+        name for shard in plan["shards"] if shard["index"] != index
+        for name in shard["projects"].get(project, [])
+    )
+    return "&".join(f"FullyQualifiedName!~{name}{sep}" for name in others for sep in NAME_SEPARATORS) or None
+
+def plan_shards(shard_count):
+    """Spread the test classes over shard_count shards, longest classes first"""
+    durations = class_durations()
+    classes = known_test_classes() | set(durations)
+    # Classes without history get the average of the timed ones
+    default = sum(durations.values()) / len(durations) if durations else 1.0
+    
+    shards = [{"index": idx, "estimated_seconds": 0.0, "projects": defaultdict(list)} for idx in range(shard_count)]
+    heap = [(0.0, idx) for idx in range(shard_count)]
+    for project, class_name in sorted(classes, key=lambda key: (-durations.get(key, default), key)):
+        load, idx = heapq.heappop(heap)
+        shard = shards[idx]
+        if project not in shard["projects"]:
+            load += PROJECT_OVERHEAD
+        load += durations.get((project, class_name), default)
+        shard["projects"][project].append(class_name)
+        shard["estimated_seconds"] = load
+        heapq.heappush(heap, (load, idx))
+    
+    for shard in shards:
+        shard["projects"] = {project: sorted(names) for project, names in sorted(shard["projects"].items())}
+        shard["remainder"] = False
+    # The least loaded shard picks up whatever the plan did not assign
+    min(shards, key=lambda shard: shard["estimated_seconds"])["remainder"] = True
+    return {"version": SHARD_PLAN_VERSION, "shards": shards}
+
+def save_plan(plan, plan_file):
+    """Write a shard plan as JSON"""
+    with open(plan_file, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=1)
+
+def load_plan(plan_file):
+    """Read a shard plan written by `plan`"""
+    with open(plan_file, 'r', encoding='utf-8') as f:
+        plan = json.load(f)
+    if plan.get("version") != SHARD_PLAN_VERSION:
+        raise ValueError(f"Unsupported shard plan version in {plan_file}")
+    return plan
+
+def build_test_projects(projects, jobs=None):
+    """Build what is outdated once, before any shard runs; returns the projects whose build failed"""
+    # Shards must never build: parallel MSBuild runs race on shared bin/ and obj/
+    summary = build_outdated(projects, load_projects(), BASE_PATH, jobs=jobs)
+    for csproj in projects:
+        if csproj.stem in summary["failed"]:
+            print(f"Not testing {csproj.stem}: its build failed")
+    return sorted(summary["failed"])
+
+def run_shard(plan, index, jobs=None, build=False):
+    """Run one shard of a plan, writing TRX files under ShardResults/shard-<index>"""
+    shard = plan["shards"][index]
+    projects = []
+    filters = {}
+    if shard["remainder"]:
+        # Every test project, minus the classes the other shards run
+        for csproj in discover_test_projects():
+            projects.append(csproj)
+            filters[csproj] = remainder_filter(plan, index, csproj.stem)
+    else:
+        for project, class_names in shard["projects"].items():
+            csproj = BASE_PATH / project / f"{project}.csproj"
+            projects.append(csproj)
+            filters[csproj] = class_filter(class_names)
+    
+    print(f"Shard {index + 1}/{len(plan['shards'])}: {sum(len(c) for c in shard['projects'].values())} test classes"
+          f"{' and every unassigned test' if shard['remainder'] else ''}, estimated {shard['estimated_seconds']:.1f}s")
+    excluded = set(plan.get("excluded_projects", []))
+    if build:
+        excluded.update(build_test_projects(projects, jobs))
+    projects = [csproj for csproj in projects if csproj.stem not in excluded]
+    if not projects:
+        return []
+    return run_tests(
+        jobs=jobs, projects=projects, filters=filters,
+        results_root=SHARD_RESULTS_DIR / f"shard-{index}"
+    )
+
+def merge_shard_results(results_dirs):
+    """Parse every shard TRX file under the given directories into one store"""
+    test_results, trx_count = parse_trx_tree(results_dirs)
+    print(f"Merged {len(test_results)} test results from {trx_count} TRX files")
+    return test_results
+
+def update_statistics(test_results, top_n=20):
+    """Update the CSV files and the workbook from merged shard results"""
+    if not test_results:
+        print("No shard results found.")
+        return
+    statistics, _ = update_csv_with_results(test_results)
+    performance_rows = update_performance_report(test_results, top_n=top_n)
+    if statistics is not None:
+        # Shard runs do not classify flaky tests, so the workbook keeps the last report
+        statistics.performance, statistics.flaky = performance_rows, read_flaky_csv()
+    regenerate_excel(statistics)
+
+def run_local(shard_count, plan_file, build=False):
+    """Plan, run every shard as its own process and merge, like CI would"""
+    shutil.rmtree(SHARD_RESULTS_DIR, ignore_errors=True)
+    plan = plan_shards(shard_count)
+    if build:
+        # Built once here; the shard processes all run with --no-build
+        plan["excluded_projects"] = build_test_projects(discover_test_projects())
+    save_plan(plan, plan_file)
+    processes = []
+    for index in range(shard_count):
+        command = [sys.executable, str(Path(__file__)), "run", "--plan", str(plan_file), "--index", str(index)]
+        processes.append(subprocess.Popen(command, cwd=BASE_PATH))
+    
+    failed = [index for index, process in enumerate(processes) if process.wait() != 0]
+    if failed:
+        print(f"Shards failed: {', '.join(str(index) for index in failed)}")
+    update_statistics(merge_shard_results([SHARD_RESULTS_DIR]))
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Run the test projects as balanced shards")
+    parser.add_argument("--plan", type=Path, default=SHARD_PLAN_FILE, help="Shard plan file (default: shard_plan.json)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    plan_parser = commands.add_parser("plan", help="Write a shard plan from past class durations")
+    plan_parser.add_argument("--shards", type=int, required=True, help="Number of shards")
+    
+    run_parser = commands.add_parser("run", help="Run one shard of the plan")
+    run_parser.add_argument("--index", type=int, required=True, help="Shard to run (0-based)")
+    run_parser.add_argument("-j", "--jobs", type=int, default=None, help="Test projects run in parallel")
+    run_parser.add_argument("--build", action="store_true", help="Build the outdated projects of the shard before testing")
+    
+    merge_parser = commands.add_parser("merge", help="Merge shard TRX files into the statistics")
+    merge_parser.add_argument("dirs", nargs="*", type=Path, default=[SHARD_RESULTS_DIR],
+                              help="Directories holding shard-*/<Project>/TestResults (default: ShardResults)")
+    merge_parser.add_argument("--top", type=int, default=20, help="Slowest tests in the performance report")
+    
+    local_parser = commands.add_parser("local", help="Plan, run every shard in its own process and merge")
+    local_parser.add_argument("--shards", type=int, required=True, help="Number of shards")
+    local_parser.add_argument("--build", action="store_true", help="Build the outdated projects once before starting the shards")
+    
+    # Options such as --plan may come after the subcommand too
+    for subparser in (plan_parser, run_parser, merge_parser, local_parser):
+        subparser.add_argument("--plan", type=Path, default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    
+    if args.command == "plan":
+        plan = plan_shards(args.shards)
+        save_plan(plan, args.plan)
+        for shard in plan["shards"]:
+            classes = sum(len(names) for names in shard["projects"].values())
+            print(f"  - shard {shard['index']}: {classes} test classes in {len(shard['projects'])} projects, "
+                  f"estimated {shard['estimated_seconds']:.1f}s{' (+ unassigned tests)' if shard['remainder'] else ''}")
+        print(f"Shard plan written to {args.plan}")
+    elif args.command == "run":
+        results = run_shard(load_plan(args.plan), args.index, jobs=args.jobs, build=args.build)
+        sys.exit(1 if any(result["returncode"] != 0 for result in results) else 0)
+    elif args.command == "merge":
+        update_statistics(merge_shard_results(args.dirs), top_n=args.top)
+    elif args.command == "local":
+        run_local(args.shards, args.plan, build=args.build)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Watch the solution's source folders and report batches of changed files.
+
+Uses watchdog (inotify on Linux, ReadDirectoryChangesW on Windows) when it
+is installed and falls back to polling file modification times otherwise.
+"""
+import os
+import time
+import threading
+from pathlib import Path
+
+WATCHED_SUFFIXES = (".cs", ".csproj")
+SKIP_DIRS = {"bin", "obj", "TestResults", ".vs", ".git"}
+
+def snapshot(roots):
+    """Modification time of every watched file under the roots"""
+    mtimes = {}
+    pending = [str(root) for root in roots]
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in SKIP_DIRS:
+                            pending.append(entry.path)
+                    elif entry.name.endswith(WATCHED_SUFFIXES):
+                        mtimes[entry.path] = entry.stat().st_mtime_ns
+        except FileNotFoundError:
+            continue
+    return mtimes
+
+def poll_changes(roots, interval=1.0):
+    """Yield sets of files added, modified or deleted between polls"""
+    previous = snapshot(roots)
+    while True:
+        time.sleep(interval)
+        current = snapshot(roots)
+        changed = {
+            path for path in previous.keys() | current.keys()
+            if previous.get(path) != current.get(path)
+        }
+        previous = current
+        if changed:
+            yield {Path(path) for path in changed}
+
+def is_watched(path):
+    """Whether a path is a source file outside the build output folders"""
+    path = Path(path)
+    return path.name.endswith(WATCHED_SUFFIXES) and not SKIP_DIRS.intersection(path.parts)
+
+def notify_changes(roots, interval=1.0):
+    """Yield sets of changed files reported by watchdog, once they settle"""
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    
+    changed = set()
+    lock = threading.Lock()
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            if event.is_directory:
+                return
+            paths = [event.src_path, getattr(event, "dest_path", "")]
+            with lock:
+                changed.update(Path(path) for path in paths if path and is_watched(path))
+    
+    observer = Observer()
+    for root in roots:
+        observer.schedule(Handler(), str(root), recursive=True)
+    observer.start()
+    try:
+        pending = set()
+        while True:
+            time.sleep(interval)
+            with lock:
+                batch = set(changed)
+                changed.clear()
+            # Editors save in several steps, so wait for a quiet interval
+            if batch:
+                pending |= batch
+            elif pending:
+                yield pending
+                pending = set()
+    finally:
+        observer.stop()
+        observer.join()
+
+def watch_changes(roots, interval=1.0):
+    """Yield sets of changed source files under the roots"""
+    try:
+        import watchdog  # noqa: F401
+    except ImportError:
+        print("watchdog is not installed, polling for changes (pip install watchdog for file system events)")
+        return poll_changes(roots, interval)
+    return notify_changes(roots, interval)
@@ -0,0 +1,231 @@
+"""
+Typed in-memory model of the unit test statistics.
+
+The scripts build a TestStatistics (a ComponentStats per component, the
+per-category summary and, after a test run, the performance and flaky
+reports) and hand it to sinks: CsvSink writes the statistics CSV files, the
+workbook sink of create_excel_statistics.py builds its sheets straight from
+the objects. The CSV files are only parsed when a script starts from them
+(TestStatistics.from_csv).
+"""
+import csv
+from pathlib import Path
+
+import profiling
+from coverage_report import percent, write_coverage_csv
+from flaky_tests import read_flaky_csv
+
+BASE_PATH = Path(__file__).parent
+DETAILED_CSV = BASE_PATH / "Unit_Test_Statistics_Detailed.csv"
+SUMMARY_CSV = BASE_PATH / "Unit_Test_Statistics_Summary.csv"
+COVERAGE_CSV = BASE_PATH / "Unit_Test_Coverage.csv"
+PERFORMANCE_CSV = BASE_PATH / "Unit_Test_Performance.csv"
+DETAILED_HEADERS = ["No", "Component Name", "Type", "Module", "Namespace", "Test File", "Status", "Test Count", "File Path"]
+SUMMARY_HEADERS = ["Category", "Count", "Tests Created", "Tests Passed", "Coverage %", "Branch Coverage %"]
+PERFORMANCE_HEADERS = ["Section", "Name", "Project", "Tests", "Duration (s)", "% of Total"]
+
+# Summary category of each component type, in summary order
+CATEGORIES = {
+    "Service": "Services",
+    "SagaService": "Services",
+    "Controller": "Controllers",
+    "Repository": "Repositories",
+}
+
+class ComponentStats:
+    """One component (a row of the detailed statistics)"""
+    __slots__ = ("number", "name", "type", "module", "namespace", "test_file", "status", "test_count",
+                 "file_path", "coverage")
+
+    def __init__(self, number, name, type, module, namespace, test_file, status="Pending", test_count=0,
+                 file_path="", coverage=None):
+        self.number = number
+        self.name = name
+        self.type = type
+        self.module = module
+        self.namespace = namespace
+        self.test_file = test_file
+        self.status = status
+        self.test_count = test_count
+        self.file_path = file_path
+        # (lines covered, lines total, branches covered, branches total), once coverage was collected
+        self.coverage = coverage
+
+    def __repr__(self):
+        return f"ComponentStats({self.name!r}, {self.type!r}, {self.status!r})"
+    
+    @property
+    def category(self):
+        """Summary category (Services, Controllers, Repositories), or None"""
+        return CATEGORIES.get(self.type)
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build a component from a detailed CSV row"""
+        return cls(
+            int(row["No"]),
+            row["Component Name"],
+            row["Type"],
+            row["Module"],
+            row["Namespace"],
+            row["Test File"],
+            row["Status"],
+            int(row.get("Test Count") or 0),
+            row["File Path"]
+        )
+
+    def to_row(self):
+        """Values of the detailed CSV row, in DETAILED_HEADERS order"""
+        return [
+            self.number, self.name, self.type, self.module, self.namespace,
+            self.test_file, self.status, self.test_count, self.file_path
+        ]
+
+class CategorySummary:
+    """Totals of one summary category (or of all of them)"""
+    __slots__ = ("category", "count", "tests_created", "tests_passed", "coverage", "branch_coverage")
+
+    def __init__(self, category, count, tests_created, tests_passed=0, coverage="N/A", branch_coverage="N/A"):
+        self.category = category
+        self.count = count
+        self.tests_created = tests_created
+        self.tests_passed = tests_passed
+        self.coverage = coverage
+        self.branch_coverage = branch_coverage
+    
+    @classmethod
+    def from_row(cls, row):
+        """Build a summary from a summary CSV row"""
+        return cls(
+            row["Category"],
+            int(row["Count"]),
+            int(row["Tests Created"]),
+            int(row.get("Tests Passed") or 0),
+            row.get("Coverage %") or "N/A",
+            row.get("Branch Coverage %") or "N/A"
+        )
+
+    def to_row(self):
+        """Values of the summary CSV row, in SUMMARY_HEADERS order"""
+        return [self.category, self.count, self.tests_created, self.tests_passed, self.coverage, self.branch_coverage]
+
+def summarize(components):
+    """Per-category totals (tests, passed components, line/branch coverage) plus a TOTAL row"""
+    totals = {category: [0, 0, 0, [0, 0, 0, 0]] for category in dict.fromkeys(CATEGORIES.values())}
+    for component in components:
+        category = component.category
+        if category is None:
+            continue
+        counts = totals[category]
+        counts[0] += 1
+        counts[1] += component.test_count
+        if "Passed" in component.status:
+            counts[2] += 1
+        # Lines/branches covered and total of the component's source file
+        if component.coverage:
+            for idx, value in enumerate(component.coverage):
+                counts[3][idx] += value
+    
+    totals["TOTAL"] = [
+        sum(counts[0] for counts in totals.values()),
+        sum(counts[1] for counts in totals.values()),
+        sum(counts[2] for counts in totals.values()),
+        [sum(counts[3][idx] for counts in totals.values()) for idx in range(4)]
+    ]
+    return [
+        CategorySummary(
+            category, count, tests, passed,
+            percent(coverage[0], coverage[1]),
+            percent(coverage[2], coverage[3])
+        )
+        for category, (count, tests, passed, coverage) in totals.items()
+    ]
+
+class TestStatistics:
+    """Components and summary handed from stage to stage"""
+
+    def __init__(self, components, summary=None, performance=None, flaky=None):
+        self.components = components
+        self.summary = summary if summary is not None else summarize(components)
+        # Report rows of a test run, None until one was made: performance rows
+        # in PERFORMANCE_HEADERS order, flaky rows keyed by FLAKY_HEADERS
+        self.performance = performance
+        self.flaky = flaky
+    
+    @property
+    def has_coverage(self):
+        """Whether coverage was collected for any component"""
+        return any(component.coverage is not None for component in self.components)
+
+    def by_type(self, types):
+        """Components of the given types, in order"""
+        return [component for component in self.components if component.type in types]
+    
+    @classmethod
+    def from_csv(cls, reports=False):
+        """Read the statistics back from the CSV files; None if they are missing"""
+        if not DETAILED_CSV.exists() or not SUMMARY_CSV.exists():
+            return None
+        with open(DETAILED_CSV, 'r', encoding='utf-8-sig') as f:
+            components = [ComponentStats.from_row(row) for row in csv.DictReader(f)]
+        with open(SUMMARY_CSV, 'r', encoding='utf-8-sig') as f:
+            summary = [CategorySummary.from_row(row) for row in csv.DictReader(f)]
+        
+        # Coverage of the last run that collected it, matched on the source file
+        if COVERAGE_CSV.exists():
+            with open(COVERAGE_CSV, 'r', encoding='utf-8-sig') as f:
+                coverage = {
+                    row["File Path"]: (
+                        int(row["Lines Covered"]), int(row["Lines Total"]),
+                        int(row["Branches Covered"]), int(row["Branches Total"])
+                    )
+                    for row in csv.DictReader(f)
+                }
+            for component in components:
+                component.coverage = coverage.get(component.file_path)
+        # The reports are only needed by the workbook when it is built on its own
+        if not reports:
+            return cls(components, summary)
+        return cls(components, summary, read_performance_csv(), read_flaky_csv())
+
+def read_performance_csv():
+    """Rows of the performance CSV, or None if no run was timed yet"""
+    if not PERFORMANCE_CSV.exists():
+        return None
+    with open(PERFORMANCE_CSV, 'r', encoding='utf-8-sig') as f:
+        return [
+            [row["Section"], row["Name"], row["Project"], int(row["Tests"]), float(row["Duration (s)"]), row["% of Total"]]
+            for row in csv.DictReader(f)
+        ]
+
+def write_performance_csv(rows):
+    """Write the performance report rows"""
+    with open(PERFORMANCE_CSV, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(PERFORMANCE_HEADERS)
+        writer.writerows([*row[:4], f"{row[4]:.3f}", row[5]] for row in rows)
+
+class CsvSink:
+    """Writes the detailed and summary CSV files (and the coverage CSV, if collected)"""
+
+    def write(self, statistics):
+        with open(DETAILED_CSV, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(DETAILED_HEADERS)
+            writer.writerows(component.to_row() for component in statistics.components)
+        print(f"Updated {DETAILED_CSV}")
+        
+        with open(SUMMARY_CSV, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(SUMMARY_HEADERS)
+            writer.writerows(summary.to_row() for summary in statistics.summary)
+        print(f"Updated {SUMMARY_CSV}")
+        
+        if statistics.has_coverage:
+            write_coverage_csv(statistics.components)
+
+def write_statistics(statistics, sinks):
+    """Hand the statistics to every sink"""
+    for sink in sinks:
+        with profiling.span(type(sink).__name__):
+            sink.write(statistics)